@@ -0,0 +1,305 @@
+"""
+Data Analysis and Visualization, lab 2
+Patrycja Owczarek
+Script for creating the "similar countries" animation for every country:
+the plot of one spec (for example fig8, similar to Japan in 1984) is made for all
+countries (and anchor years) in the pool of processes. Every process reads the data
+only once, the finished files are skipped, so the batch can be started again after a crash.
+The animations without data are written to the log of the batch (.batch_<name>.jsonl in
+the folder of the files) with the skipped status, so they are not tried again. The animations
+which fail get the failed status, the batch goes on and they are made again in the next run.
+
+python batch.py fig8 --years 1970 1984 --workers 4
+"""
+
+import argparse
+import copy
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from density import read_area
+from engine import Plot, load_data, select_countries, area_path, population_path
+from specs import specs
+from world_bank import read_world_bank
+
+global df
+global area
+global names
+
+
+def init_worker():
+    """init_worker
+
+     This function is called once in every process of the pool, it read the population,
+     the area and the country names (shared by all animations of the process)
+
+     Args:
+         None
+
+     Returns:
+         None
+         """
+    global df
+    global area
+    global names
+    df = load_data()
+    area = read_area(area_path)
+    names = country_names()
+
+
+def country_names():
+    """country_names
+
+     This function read the names of the countries for the titles of the plots
+
+     Args:
+         None
+
+     Returns:
+         (dict): country code -> country name
+         """
+    df_names = read_world_bank(population_path)
+    return dict(zip(df_names['Country Code'], df_names['Country Name']))
+
+
+def similar_spec(base, country, year, name):
+    """similar_spec
+
+     This function change the spec of the plot to the countries similar to other
+     country in other year. The y axis is fitted to the data.
+
+     Args:
+         base (dict): the spec with the 'similar' rule (for example fig8)
+         country (str): the country code
+         year (str): the anchor year
+         name (str): the name of the country for the title
+
+     Returns:
+         spec (dict): the new spec named like fig8_POL_1970
+         """
+    spec = copy.deepcopy(base)
+    spec['name'] = '%s_%s_%s' % (base['name'], country, year)
+    spec['select'].update({'country': country, 'year': str(year)})
+    spec['ylim'] = None
+    text, size, weight = base['title']
+    spec['title'] = ('Countries most similar to population of %s in %s' % (name, year), size, weight)
+    return spec
+
+
+def output_paths(images, name):
+    """output_paths
+
+     This function return the paths of the mp4 and gif files of the animation
+
+     Args:
+         images (str): the folder for the files
+         name (str): the name of the animation
+
+     Returns:
+         (tuple): paths of the mp4 and gif files
+         """
+    return os.path.join(images, name + '.mp4'), os.path.join(images, name + '.gif')
+
+
+def is_done(images, name):
+    """is_done
+
+     This function check if both files of the animation are already saved
+
+     Args:
+         images (str): the folder for the files
+         name (str): the name of the animation
+
+     Returns:
+         (bool): True if the animation does not need to be made again
+         """
+    return all(os.path.exists(path) for path in output_paths(images, name))
+
+
+def log_path(images, name):
+    """log_path
+
+     This function return the path of the log of the batch
+
+     Args:
+         images (str): the folder for the files
+         name (str): the name of the spec
+
+     Returns:
+         (str): path to the .jsonl file
+         """
+    return os.path.join(images, '.batch_%s.jsonl' % name)
+
+
+def read_log(path):
+    """read_log
+
+     This function read the status of the finished animations from the log
+
+     Args:
+         path (str): path to the .jsonl file
+
+     Returns:
+         (dict): the name of the animation -> done or skipped
+         """
+    if not os.path.exists(path):
+        return {}
+    status = {}
+    with open(path) as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            status[record['name']] = record['status']
+    return status
+
+
+def write_log(file, name, status, seconds=None):
+    """write_log
+
+     This function add one finished animation to the log (one JSON object per line,
+     written at once, so a crash leaves at most the last line broken)
+
+     Args:
+         file (file): the log opened for appending
+         name (str): the name of the animation
+         status (str): done, skipped or failed
+         seconds (float): how long the animation took or None
+
+     Returns:
+         None
+         """
+    file.write(json.dumps({'name': name, 'status': status, 'seconds': seconds}) + '\n')
+    file.flush()
+
+
+def render_one(base, country, year, images):
+    """render_one
+
+     This function make one animation in the process of the pool. The files are saved
+     under temporary names and renamed at the end, so a crash never leaves a file
+     which looks finished, the temporary files are removed if the animation fails.
+
+     Args:
+         base (dict): the spec with the 'similar' rule
+         country (str): the country code
+         year (str): the anchor year
+         images (str): the folder for the files
+
+     Returns:
+         name (str): the name of the animation
+         seconds (float): how long the animation took, None if there is no data to plot
+         """
+    global df
+    global area
+    global names
+    start = time.perf_counter()
+    spec = similar_spec(base, country, year, names.get(country, country))
+    if select_countries(df, spec['select']).empty:
+        return spec['name'], None
+    plot = Plot(spec, df, area)
+    mp4, gif = output_paths(images, spec['name'])
+    part = os.path.join(images, '.part_' + spec['name'])
+    try:
+        plot.prepare_data()
+        plot.name = '.part_' + spec['name']
+        plot.save_plot(images)
+        os.replace(part + '.gif', gif)
+        os.replace(part + '.mp4', mp4)
+    finally:
+        plt.close(plot.fig)
+        for path in (part + '.gif', part + '.mp4'):
+            if os.path.exists(path):
+                os.remove(path)
+    return spec['name'], time.perf_counter() - start
+
+
+def batch(name, years=None, countries=None, images='../images/batch', workers=None):
+    """batch
+
+     This function make the animation of the spec for all countries and years
+     in the pool of processes and print the progress and the throughput
+
+     Args:
+         name (str): the name of the spec with the 'similar' rule (for example fig8)
+         years (list): the anchor years, None for the year of the spec
+         countries (list): the country codes, None for all countries with data in the year
+         images (str): the folder for the files
+         workers (int): the number of processes, None for the number of cores
+
+     Returns:
+         done (int): the number of animations made
+         """
+    base = next(spec for spec in specs if spec['name'] == name)
+    if base['select']['rule'] != 'similar':
+        raise ValueError('%s does not show similar countries' % name)
+    years = [str(x) for x in years or [base['select']['year']]]
+    df_all = load_data()
+    os.makedirs(images, exist_ok=True)
+    status = read_log(log_path(images, name))
+    tasks = []
+    finished = 0
+    skipped = 0
+    for year in years:
+        codes = countries or list(df_all.index[df_all[year].notna()])
+        for country in codes:
+            plot_name = '%s_%s_%s' % (name, country, year)
+            if status.get(plot_name) == 'skipped':
+                skipped += 1
+            elif is_done(images, plot_name):
+                finished += 1
+            else:
+                tasks.append((country, year))
+    print('%d animations to make, %d already done, %d skipped (no data)' % (len(tasks), finished, skipped))
+    start = time.perf_counter()
+    done = 0
+    failed = 0
+    with ProcessPoolExecutor(workers, initializer=init_worker) as pool, \
+            open(log_path(images, name), 'a') as log:
+        futures = {pool.submit(render_one, base, country, year, images): '%s_%s_%s' % (name, country, year)
+                   for country, year in tasks}
+        for k, future in enumerate(as_completed(futures), 1):
+            try:
+                plot_name, seconds = future.result()
+            except Exception as error:
+                failed += 1
+                write_log(log, futures[future], 'failed')
+                print('[%d/%d] %s: failed (%s)' % (k, len(tasks), futures[future], error))
+                continue
+            elapsed = time.perf_counter() - start
+            if seconds is None:
+                write_log(log, plot_name, 'skipped')
+                print('[%d/%d] %s: no data' % (k, len(tasks), plot_name))
+                continue
+            write_log(log, plot_name, 'done', seconds)
+            done += 1
+            print('[%d/%d] %s: %.1f s, %.1f animations/min' % (k, len(tasks), plot_name, seconds,
+                                                              60 * done / elapsed))
+    elapsed = time.perf_counter() - start
+    if done:
+        print('%d animations in %.1f s: %.1f animations/min' % (done, elapsed, 60 * done / elapsed))
+    if failed:
+        print('%d animations failed, they are made again in the next run' % failed)
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Make the similar countries plot for every country')
+    parser.add_argument('name', help='the spec with the similar rule, for example fig8')
+    parser.add_argument('--years', nargs='+', help='the anchor years (default: the year of the spec)')
+    parser.add_argument('--countries', nargs='+', help='the country codes (default: all)')
+    parser.add_argument('--images', default='../images/batch', help='the folder for the files')
+    parser.add_argument('--workers', type=int, help='the number of processes')
+    args = parser.parse_args()
+    batch(args.name, args.years, args.countries, args.images, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+"""
+Data Analysis and Visualization, lab 2
+Patrycja Owczarek
+Script for measuring every stage of one animated plot:
+read_file (parsing the .csv and from the cache), clean_dataframe (load_data),
+get_countries (select_countries), calculate_density, one frame of create_plot and update_plot, ani.save of mp4,
+save_plot (mp4 and gif) with its encode stage (writer.finish: the rest of the ffmpeg encoding and the palette
+pass of the gif after the last frame) and the peak memory (RSS) of the process. For the stages
+working on the data the peak of memory allocated by one call (tracemalloc) is measured too.
+Every dataset size (1x, 10x, 100x the countries of the population .csv) is measured
+in a new process and the results are saved as JSON, so two versions can be compared.
+
+python benchmark.py --script fig11 --sizes 1 10 100
+python benchmark.py --compare old.json new.json
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.animation import FFMpegWriter
+import numpy as np
+
+from countries import cache_dir
+from density import density_matrix, read_area
+from engine import area_path, find_spec, load_data, make_plot, population_path, select_countries
+from renderer import frame_timing
+from world_bank import cache_paths, read_world_bank
+from writers import PipelinedWriter
+
+traced = ['read_file', 'clean_dataframe', 'get_countries', 'calculate_density']
+stages = ['read_file_parse', 'read_file', 'clean_dataframe', 'get_countries', 'calculate_density',
+          'create_plot', 'update_plot', 'ani_save', 'save_plot', 'encode']
+
+
+def synthetic_dataset(size, seed=0):
+    """synthetic_dataset
+
+     This function write the population .csv with size times more rows: the first copy
+     is the original data, the other copies have the population changed by a few percent
+     (the country codes are the same, so the rows are not dropped as aggregates)
+
+     Args:
+         size (int): how many times the rows of the original file are repeated
+         seed (int): the seed of the random changes
+
+     Returns:
+         df_path (str): path to the .csv file (in the cache folder)
+         """
+    if size == 1:
+        return population_path
+    df_path = os.path.join(cache_dir, 'benchmark_population_x%d.csv' % size)
+    if os.path.exists(df_path):
+        return df_path
+    rng = np.random.default_rng(seed)
+    with open(population_path, encoding='utf-8-sig', newline='') as file:
+        header = [next(file) for _ in range(4)]
+        rows = list(csv.reader(file))
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(df_path + '.tmp', 'w', encoding='utf-8', newline='') as file:
+        file.writelines(header)
+        writer = csv.writer(file, quoting=csv.QUOTE_ALL, lineterminator='\n')
+        writer.writerow(rows[0])
+        for copy in range(size):
+            for row in rows[1:]:
+                if copy:
+                    change = 1 + rng.normal(0, 0.02)
+                    row = row[:4] + ['%.0f' % (float(x) * change) if x else x for x in row[4:]]
+                writer.writerow(row)
+    os.replace(df_path + '.tmp', df_path)
+    return df_path
+
+
+def peak_rss():
+    """peak_rss
+
+     This function return the peak memory of the process so far
+
+     Args:
+         None
+
+     Returns:
+         (float): the peak resident set size in MB
+         """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def timeit(func, repeat):
+    """timeit
+
+     This function call the function repeat times and measure every call
+
+     Args:
+         func (function): the function without arguments
+         repeat (int): the number of calls
+
+     Returns:
+         (list): the time of every call in seconds
+         """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def peak_alloc(func):
+    """peak_alloc
+
+     This function call the function once and measure the peak of the memory
+     allocated during the call (numpy and pandas report their arrays to tracemalloc)
+
+     Args:
+         func (function): the function without arguments
+
+     Returns:
+         (float): the peak of the allocated memory in MB
+         """
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024 ** 2
+    finally:
+        tracemalloc.stop()
+
+
+def summary(times):
+    """summary
+
+     This function describe the measured times
+
+     Args:
+         times (list): the times in seconds
+
+     Returns:
+         (dict): the number of measurements, min, median and mean in ms
+         """
+    times = np.asarray(times) * 1000
+    return {'n': len(times), 'min_ms': float(times.min()), 'median_ms': float(np.median(times)),
+            'mean_ms': float(times.mean())}
+
+
+def run_stages(name, size, selected, repeat):
+    """run_stages
+
+     This function measure the stages of the plot for one dataset size,
+     it is run in a new process for every size (the peak memory is of this size only).
+     The plot is made from the synthetic dataset: read_file parse the .csv (or read the cache),
+     clean_dataframe is load_data, get_countries is select_countries of the plot,
+     calculate_density is density_matrix of the bubble plots, encode is writer.finish of save_plot
+     (with the pipelined writer it waits for the drawn frames still in the queue too)
+
+     Args:
+         name (str): the name of the plot (for example fig11)
+         size (int): the size of the dataset (times the original)
+         selected (list): the names of the stages to measure
+         repeat (int): the number of calls of the cheap stages
+
+     Returns:
+         (dict): the results of the stages and the peak memory
+         """
+    df_path = synthetic_dataset(size)
+    spec = find_spec(name)
+    results = {}
+
+    def measure(stage, func, n=repeat):
+        if stage not in selected:
+            return
+        try:
+            results[stage] = summary(timeit(func, n))
+            if stage in traced:
+                results[stage]['peak_alloc_mb'] = peak_alloc(func)
+        except Exception as error:
+            results[stage] = {'error': '%s: %s' % (type(error).__name__, error)}
+        results[stage]['peak_rss_mb'] = peak_rss()
+
+    def parse():
+        for path in cache_paths(df_path):
+            if os.path.exists(path):
+                os.remove(path)
+        read_world_bank(df_path)
+
+    measure('read_file_parse', parse, 1)
+    measure('read_file', lambda: read_world_bank(df_path))
+    measure('clean_dataframe', lambda: load_data(df_path))
+    df = load_data(df_path)
+    measure('get_countries', lambda: select_countries(df, spec['select']))
+    area = read_area(area_path)
+    if spec['kind'] == 'bubble':
+        selected_df = select_countries(df, spec['select']).T
+        measure('calculate_density', lambda: density_matrix(selected_df, area, spec['scale']))
+    plot = make_plot(name, df, area)
+    plot.prepare_data()
+    for stage, func, init_func in [('create_plot', plot.create_plot, None),
+                                   ('update_plot', plot.update_plot, plot.init_plot)]:
+        if stage not in selected:
+            continue
+        try:
+            n = len(plot.years) if stage == 'create_plot' else len(plot.frame_years)
+            func_times, draw_times = frame_timing(plot.fig, func, n, init_func)
+            results[stage] = summary(func_times)
+            results[stage]['with_draw'] = summary(func_times + draw_times)
+        except Exception as error:
+            results[stage] = {'error': '%s: %s' % (type(error).__name__, error)}
+        results[stage]['peak_rss_mb'] = peak_rss()
+    with tempfile.TemporaryDirectory() as folder:
+        def ani_save():
+            ani = plot.animation()
+            ani.save(os.path.join(folder, 'plot.mp4'), writer=FFMpegWriter(fps=5))
+
+        measure('ani_save', ani_save, 1)
+        finish = PipelinedWriter.finish
+        finish_times = []
+
+        def timed_finish(writer):
+            start = time.perf_counter()
+            try:
+                finish(writer)
+            finally:
+                finish_times.append(time.perf_counter() - start)
+
+        PipelinedWriter.finish = timed_finish
+        try:
+            measure('save_plot', lambda: plot.save_plot(folder), 1)
+            if 'encode' in selected and not finish_times:
+                # save_plot is not measured, it is run only for the time of its finish
+                measure('encode', lambda: plot.save_plot(folder), 1)
+        finally:
+            PipelinedWriter.finish = finish
+        if 'encode' in selected and finish_times:
+            results['encode'] = summary(finish_times)
+            results['encode']['peak_rss_mb'] = peak_rss()
+    return {'stages': results, 'peak_rss_mb': peak_rss()}
+
+
+def versions():
+    """versions
+
+     This function describe the version of the code and the libraries
+
+     Args:
+         None
+
+     Returns:
+         (dict): git commit, python, numpy, pandas and matplotlib versions
+         """
+    import pandas
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit, 'python': platform.python_version(), 'numpy': np.__version__,
+            'pandas': pandas.__version__, 'matplotlib': matplotlib.__version__,
+            'machine': platform.machine(), 'cpus': os.cpu_count()}
+
+
+def benchmark(name, sizes, selected, repeat, output):
+    """benchmark
+
+     This function measure all sizes (every size in a new process) and save the results
+
+     Args:
+         name (str): the name of the script (for example fig11)
+         sizes (list): the sizes of the dataset
+         selected (list): the names of the stages to measure
+         repeat (int): the number of calls of the cheap stages
+         output (str): path to the JSON file
+
+     Returns:
+         results (dict): the saved results
+         """
+    results = {'script': name, 'versions': versions(), 'repeat': repeat, 'sizes': {}}
+    for size in sizes:
+        print('%s x%d...' % (name, size), file=sys.stderr)
+        proc = subprocess.run([sys.executable, __file__, '--script', name, '--worker', str(size),
+                               '--repeat', str(repeat), '--stages'] + selected,
+                              capture_output=True, text=True, check=True)
+        results['sizes'][str(size)] = json.loads(proc.stdout.splitlines()[-1])
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as file:
+        json.dump(results, file, indent=1)
+    print_results(results)
+    return results
+
+
+def print_results(results):
+    """print_results
+
+     This function print the median time of every stage for every size
+     and the peak of the allocated memory of the stages working on the data
+
+     Args:
+         results (dict): the results from benchmark
+
+     Returns:
+         None
+         """
+    sizes = list(results['sizes'])
+    print('%-18s' % results['script'] + ''.join('%14s' % ('x' + size) for size in sizes))
+    for stage in stages:
+        cells = []
+        for size in sizes:
+            value = results['sizes'][size]['stages'].get(stage)
+            cells.append('%14s' % ('-' if value is None else 'error' if 'error' in value
+                                   else '%.2f ms' % value['median_ms']))
+        print('%-18s' % stage + ''.join(cells))
+    for stage in traced:
+        values = [results['sizes'][size]['stages'].get(stage, {}).get('peak_alloc_mb') for size in sizes]
+        if any(value is not None for value in values):
+            print('%-18s' % (stage[:12] + ' alloc') + ''.join('%14s' % ('-' if value is None else '%.1f MB' % value)
+                                                                for value in values))
+    print('%-18s' % 'peak RSS' + ''.join('%11.0f MB' % results['sizes'][size]['peak_rss_mb']
+                                         for size in sizes))
+
+
+def compare(old_path, new_path):
+    """compare
+
+     This function print the median times of two results and how many times
+     the new version is faster
+
+     Args:
+         old_path (str): path to the JSON file of the old version
+         new_path (str): path to the JSON file of the new version
+
+     Returns:
+         None
+         """
+    with open(old_path) as file:
+        old = json.load(file)
+    with open(new_path) as file:
+        new = json.load(file)
+    print('%-18s%8s%14s%14s%10s' % ('stage', 'size', 'old', 'new', 'speedup'))
+    for size in new['sizes']:
+        if size not in old['sizes']:
+            continue
+        for stage in stages:
+            a = old['sizes'][size]['stages'].get(stage, {})
+            b = new['sizes'][size]['stages'].get(stage, {})
+            if 'median_ms' not in a or 'median_ms' not in b:
+                continue
+            print('%-18s%8s%11.2f ms%11.2f ms%9.2fx' % (stage, 'x' + size, a['median_ms'], b['median_ms'],
+                                                        a['median_ms'] / b['median_ms']))
+            if 'peak_alloc_mb' in a and 'peak_alloc_mb' in b:
+                print('%-18s%8s%11.1f MB%11.1f MB' % ('  allocated', 'x' + size, a['peak_alloc_mb'],
+                                                      b['peak_alloc_mb']))
+        print('%-18s%8s%11.0f MB%11.0f MB' % ('peak RSS', 'x' + size, old['sizes'][size]['peak_rss_mb'],
+                                              new['sizes'][size]['peak_rss_mb']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the stages of the animated plot')
+    parser.add_argument('--script', default='fig11', help='the script to measure')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 100],
+                        help='the sizes of the dataset (times the original)')
+    parser.add_argument('--stages', nargs='+', default=stages, choices=stages)
+    parser.add_argument('--repeat', type=int, default=5, help='the number of calls of the cheap stages')
+    parser.add_argument('--output', help='the JSON file (default: ../benchmarks/<script>_<commit>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='compare two JSON files')
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+    elif args.worker:
+        print(json.dumps(run_stages(args.script, args.worker, args.stages, args.repeat)))
+    else:
+        output = args.output or '../benchmarks/%s_%s.json' % (args.script, versions()['commit'])
+        benchmark(args.script, args.sizes, args.stages, args.repeat, output)
+
+
+if __name__ == "__main__":
+    main()
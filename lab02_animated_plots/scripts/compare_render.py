@@ -0,0 +1,49 @@
+"""
+Data Analysis and Visualization, lab 2
+Patrycja Owczarek
+Script for comparing the time of one frame:
+create_plot (the plot is cleared and created again in every frame) against
+init_plot + update_plot (the artists are created once and only changed)
+"""
+
+import sys
+
+import matplotlib
+matplotlib.use('Agg')
+
+from engine import make_plot
+from renderer import frame_timing
+
+scripts = ['fig%d' % n for n in range(1, 16)]
+
+
+def compare(name):
+    """compare
+
+     This function prepare the data of one plot and measure all frames
+     with both ways of drawing the plot
+
+     Args:
+         name (str): the name of the plot (for example fig1)
+
+     Returns:
+         None
+         """
+    plot = make_plot(name)
+    plot.prepare_data()
+    frames = len(plot.years)
+    old_func, old_draw = frame_timing(plot.fig, plot.create_plot, frames)
+    frames = len(plot.frame_years)
+    new_func, new_draw = frame_timing(plot.fig, plot.update_plot, frames, plot.init_plot)
+    print('%s: frame function %.2f ms -> %.2f ms (%.0fx), with drawing %.1f ms -> %.1f ms'
+          % (name, old_func.mean() * 1000, new_func.mean() * 1000, old_func.mean() / new_func.mean(),
+             (old_func + old_draw).mean() * 1000, (new_func + new_draw).mean() * 1000))
+
+
+def main():
+    for name in sys.argv[1:] or scripts:
+        compare(name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Data Analysis and Visualization, lab 2
+Patrycja Owczarek
+Helper module for cleaning the data from The Word Bank:
+Keep the set of ISO 3166 alpha-3 codes of all countries, so the rows with
+regions and aggregates (WLD, EUU...) are removed with one isin mask.
+The set is built from pycountry once and saved in data/cache
+"""
+
+import functools
+import importlib.metadata
+import os
+
+import numpy as np
+
+cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'cache')
+
+
+@functools.lru_cache(maxsize=None)
+def alpha_3_codes():
+    """alpha_3_codes
+
+     This function return the alpha-3 codes of all countries. The codes are read
+     from the cache file for installed version of pycountry, the cache is created
+     when it does not exist
+
+     Args:
+         None
+
+     Returns:
+         codes (frozenset): set of alpha-3 codes
+         """
+    version = importlib.metadata.version('pycountry')
+    path = os.path.join(cache_dir, 'alpha_3_pycountry_%s.txt' % version)
+    if os.path.exists(path):
+        with open(path) as f:
+            return frozenset(f.read().split())
+    import pycountry as pc
+    codes = frozenset(country.alpha_3 for country in pc.countries)
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(path, 'w') as f:
+        f.write('\n'.join(sorted(codes)))
+    return codes
+
+
+def country_mask(codes):
+    """country_mask
+
+     This function find which codes are countries (not regions, income groups, world...)
+     with one vectorized isin
+
+     Args:
+         codes (array): the codes from 'Country Code'
+
+     Returns:
+         (ndarray): bool array, True for the countries
+         """
+    return np.isin(np.asarray(codes), list(alpha_3_codes()))
+
+
+def drop_aggregates(df):
+    """drop_aggregates
+
+     This function delete all non-country rows (regions, income groups, world...)
+
+     Args:
+         df (dataframe): dataframe with 'Country Code' column
+
+     Returns:
+         df (dataframe): the dataframe with countries only
+         """
+    df = df[country_mask(df['Country Code'])]
+    return df
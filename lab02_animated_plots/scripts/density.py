@@ -0,0 +1,48 @@
+"""
+Data Analysis and Visualization, lab 2
+Patrycja Owczarek
+Helper module for the animated bubble plots:
+Read the land area data from The Word Bank once and calculate the density
+of every country for every year in one step
+"""
+
+from world_bank import read_world_bank
+
+
+def read_area(df_path):
+    """read_area
+
+     This function read the .csv file with land area of countries (using the cache)
+     and save it as the dataframe indexed by country code
+
+     Args:
+         df_path (str): string contains path to the .csv dataset
+
+     Returns:
+         area (dataframe): the dataframe contains area (in sq. km) of every country
+         """
+    area = read_world_bank(df_path)
+    area = area.set_index('Country Code')
+    return area
+
+
+def density_matrix(df, area, scale=1000000):
+    """density_matrix
+
+     This function read the area of countries (if it is not read yet) and align it with the population
+     dataframe by country code and year. Then it calculate the density for all
+     countries and all years at once.
+
+     Args:
+         df (dataframe): cleaned population dataframe (years as index, countries as columns)
+         area (str or dataframe): path to the .csv dataset with area or the dataframe from read_area
+         scale (int): the number population in df was divided by (1000000 for millions)
+
+     Returns:
+         df_den (dataframe): the dataframe with density (same shape as df)
+         """
+    if isinstance(area, str):
+        area = read_area(area)
+    area = area.reindex(index=df.columns, columns=df.index).T.astype(float)
+    df_den = df.mul(scale).div(area)
+    return df_den
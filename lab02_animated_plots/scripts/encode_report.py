@@ -0,0 +1,150 @@
+"""
+Data Analysis and Visualization, lab 2
+Patrycja Owczarek
+Script for comparing the encoders of the animated plots: the frames of the plot are drawn
+only once to a raw file and encoded with every installed encoder (x264 with several presets,
+VP9, AV1, APNG, the gif of ffmpeg and of Pillow). For every file the encode time, the size
+and the decode time of one frame (ffmpeg decoding the whole file) are printed, at the end
+the sum over all plots, so the encoder can be chosen for the web page, the slides or the chat.
+
+python encode_report.py fig1 fig11 --encoders x264 vp9 apng --x264-presets ultrafast medium slow
+"""
+
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+
+from gif_report import draw_frames
+from writers import (available_encoders, encoder_args, encoders, global_palette, pipe_args,
+                     quantize_frame, save_gif)
+
+
+def variants(names=None, x264_presets=('ultrafast', 'medium', 'slow')):
+    """variants
+
+     This function return the encoders to compare, x264 once for every preset
+
+     Args:
+         names (list): the names of the encoders, None for all installed ones
+         x264_presets (list): the presets of x264
+
+     Returns:
+         (dict): the name of the output -> (encoder, preset)
+         """
+    installed = available_encoders()
+    result = {}
+    for name in names or installed:
+        if name not in installed:
+            print('%s is not installed' % name)
+        elif name == 'x264':
+            result.update({'x264-%s' % preset: ('x264', preset) for preset in x264_presets})
+        else:
+            result[name] = (name, None)
+    return result
+
+
+def encode(raw, frame_size, fps, encoder, preset, path):
+    """encode
+
+     This function encode the raw frames to the file
+
+     Args:
+         raw (str): path to the raw file
+         frame_size (tuple): width and height of the frame in pixels
+         fps (int): frames per second
+         encoder (str): the name of the encoder from encoders
+         preset (str): the preset of the encoder or None
+         path (str): path to the output file
+
+     Returns:
+         (float): the encode time in seconds
+         """
+    start = time.perf_counter()
+    if encoder == 'pillow-gif':
+        width, height = frame_size
+        drawn = np.memmap(raw, dtype=np.uint8, mode='r').reshape(-1, height, width, 4)
+        palette = global_palette(drawn)
+        save_gif([quantize_frame(frame, palette) for frame in drawn], path, fps)
+    else:
+        subprocess.run(pipe_args(frame_size, fps, raw) + encoder_args(encoder, preset) + ['-y', path],
+                       check=True)
+    return time.perf_counter() - start
+
+
+def decode_time(path, frames):
+    """decode_time
+
+     This function decode the whole file with ffmpeg (without writing the frames)
+
+     Args:
+         path (str): path to the encoded file
+         frames (int): the number of drawn frames
+
+     Returns:
+         (float): the decode time of one frame in milliseconds
+         """
+    start = time.perf_counter()
+    subprocess.run([matplotlib.rcParams['animation.ffmpeg_path'], '-loglevel', 'error', '-threads', '1',
+                    '-i', path, '-f', 'null', '-'], check=True)
+    return 1000 * (time.perf_counter() - start) / frames
+
+
+def report(names, encoder_names=None, x264_presets=('ultrafast', 'medium', 'slow')):
+    """report
+
+     This function print the encode time, the size and the decode time of every
+     encoder for every script and the sum over all scripts
+
+     Args:
+         names (list): the names of the scripts
+         encoder_names (list): the names of the encoders, None for all installed ones
+         x264_presets (list): the presets of x264
+
+     Returns:
+         results (dict): the name of the script -> the name of the output -> the results
+         """
+    outputs = variants(encoder_names, x264_presets)
+    results = {}
+    print('%-8s%-16s%10s%10s%12s' % ('script', 'encoder', 'size kB', 'encode s', 'decode ms'))
+    with tempfile.TemporaryDirectory() as folder:
+        raw = os.path.join(folder, 'frames.rgba')
+        for name in names:
+            fps, frame_size = draw_frames(name, raw)
+            frames = os.path.getsize(raw) // (frame_size[0] * frame_size[1] * 4)
+            results[name] = {}
+            for output, (encoder, preset) in outputs.items():
+                path = os.path.join(folder, '%s_%s.%s' % (name, output, encoders[encoder]['ext']))
+                seconds = encode(raw, frame_size, fps, encoder, preset, path)
+                decode = decode_time(path, frames)
+                size = os.path.getsize(path)
+                os.remove(path)
+                results[name][output] = {'size': size, 'seconds': seconds, 'decode_ms': decode}
+                print('%-8s%-16s%10.0f%10.2f%12.2f' % (name, output, size / 1000, seconds, decode))
+    print('%-8s%-16s%10s%10s%12s' % ('all', 'encoder', 'size kB', 'encode s', 'decode ms'))
+    for output in outputs:
+        rows = [results[name][output] for name in names]
+        print('%-8s%-16s%10.0f%10.2f%12.2f' % ('', output, sum(row['size'] for row in rows) / 1000,
+                                               sum(row['seconds'] for row in rows),
+                                               np.mean([row['decode_ms'] for row in rows])))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the encode time, the size and the decode time of the encoders')
+    parser.add_argument('names', nargs='*', default=['fig%d' % k for k in range(1, 16)],
+                        help='the scripts (default: all)')
+    parser.add_argument('--encoders', nargs='+', help='the encoders (default: all installed)')
+    parser.add_argument('--x264-presets', nargs='+', default=['ultrafast', 'medium', 'slow'],
+                        help='the presets of x264')
+    args = parser.parse_args()
+    report(args.names, args.encoders, args.x264_presets)
+
+
+if __name__ == "__main__":
+    main()
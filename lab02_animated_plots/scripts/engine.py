@@ -0,0 +1,405 @@
+"""
+Data Analysis and Visualization, lab 2
+Patrycja Owczarek
+Script for creating any number of animated plots in one process:
+every plot is described by its specification (see specs.py), the data from The Word Bank
+is read and cleaned only once and shared by all plots. The fig scripts only call render
+with their name, the other scripts get the plot with make_plot.
+The plots are saved as mp4 and gif, or with one of the encoders of writers.py
+
+python engine.py fig1 fig11 --encoder vp9
+"""
+
+import argparse
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib.animation import FuncAnimation
+import numpy as np
+import pandas as pd
+
+from density import density_matrix, read_area
+from nearest import PopulationIndex
+from ranking import neighbour_mask
+from renderer import (init_bars, update_bars, init_bubbles, update_bubbles,
+                      init_lines, grow_lines, init_labels, update_labels)
+from specs import specs
+from tween import steps_for_budget, tween_bars
+from world_bank import read_matrix, matrix_frame
+from writers import EncoderWriter, PillowGifWriter, PipelinedWriter, encoders
+
+population_path = '../data/API_SP.POP.TOTL_DS2_en_csv_v2_2106202.csv'
+area_path = '../data/API_AG.LND.TOTL.K2_DS2_en_csv_v2_2164047.csv'
+
+
+def load_data(df_path=population_path, indicator=None):
+    """load_data
+
+     This function read the population and clean it the same way for all plots:
+     - delete all non-country rows
+     - delete the year 2020 (no data) and country names
+
+     Args:
+         df_path (str): string contains path to the .csv dataset
+         indicator (str): the indicator code if df_path is the bulk .csv of all indicators
+
+     Returns:
+         df (dataframe): the dataframe with countries as index and years as columns
+         """
+    codes, years, values = read_matrix(df_path, drop_years=['2020'], indicator=indicator)
+    df = matrix_frame(codes, years, values)
+    return df
+
+
+def select_countries(df, select):
+    """select_countries
+
+     This function choose the countries shown on the plot, the rule is
+     described in specs.py
+
+     Args:
+         df (dataframe): the dataframe from load_data
+         select (dict): the rule and its parameters
+
+     Returns:
+         df (dataframe): the dataframe with selected countries (without missing data)
+         """
+    rule = select['rule']
+    if rule == 'race':
+        df = df.dropna()
+    elif rule == 'largest':
+        df = df.dropna()
+        df = df.loc[df[select['year']].sort_values().index[-select['k']:]]
+    elif rule == 'similar':
+        index = PopulationIndex(df)
+        df = df.iloc[index.around(select['country'], select['year'], select['start'], select['stop'])]
+        df = df.dropna()
+    elif rule == 'neighbours':
+        df, keep = neighbour_countries(df, select)
+        df = df.where(keep, 0)
+    else:
+        raise ValueError('unknown rule: %s' % rule)
+    return df
+
+
+def neighbour_countries(df, select):
+    """neighbour_countries
+
+     This function find the countries of the neighbours rule: for every year the country
+     and window bigger/smaller countries (see specs.py)
+
+     Args:
+         df (dataframe): the dataframe from load_data
+         select (dict): the rule and its parameters
+
+     Returns:
+         df (dataframe): the dataframe with the real population of the countries which are
+                         neighbours in at least one year
+         keep (dataframe): bool dataframe like df, True in the years the country is a neighbour
+         """
+    df = df.sort_values(by=df.columns[-1])
+    anchor = np.flatnonzero(df.index == select['country'])[0]
+    keep = pd.DataFrame(neighbour_mask(df, list(df.columns), anchor, select['window']),
+                        index=df.index, columns=df.columns)
+    rows = keep.any(axis=1) & df.where(keep, 0).notna().all(axis=1)
+    return df.loc[rows], keep.loc[rows]
+
+
+class Plot:
+    """Plot
+
+     One animated plot made from the specification: prepare_data, init_plot,
+     update_plot and save_plot (and create_plot which draws the whole plot again)
+
+     Args:
+         spec (dict): the specification of the plot
+         df (dataframe): the dataframe from load_data, shared by all plots
+         area (dataframe): the dataframe from read_area, shared by all plots
+     """
+
+    def __init__(self, spec, df, area=None):
+        self.spec = spec
+        self.name = spec['name']
+        self.kind = spec['kind']
+        self.base = df
+        self.area = area
+        self.years = [str(x) for x in range(*spec['years'])]
+        self.fps = spec['fps']
+        self.frames = spec.get('frames')
+        if self.frames is not None:
+            self.steps = steps_for_budget(len(self.years), self.frames)
+        else:
+            self.steps = spec.get('steps', 1)
+        self.fig, self.ax = plt.subplots(figsize=(12, 8))
+
+    def prepare_data(self):
+        """prepare_data
+
+         This function select the countries, scale the population and precompute
+         everything needed by the frames of the plot
+
+         Args:
+             None
+
+         Returns:
+             None
+             """
+        keep = None
+        if self.kind == 'bar' and self.spec['select']['rule'] == 'neighbours':
+            df, keep = neighbour_countries(self.base, self.spec['select'])
+        else:
+            df = select_countries(self.base, self.spec['select'])
+        df = df.div(self.spec['scale'])
+        self.frame_years = self.years
+        if self.kind == 'bar':
+            self.population, self.keep = df, keep
+            self.frame_codes, self.frame_values, self.frame_places, self.frame_years = \
+                tween_bars(df, self.years, steps=self.steps, frames=self.frames, keep=keep)
+            style = self.spec['style']
+            codes = style['codes'] if style['codes'] is not None else list(df.index)
+            if 'colors' in style:
+                self.colors = dict(zip(codes, plt.get_cmap(style['colors'])(range(len(codes)))))
+            else:
+                self.shapes = dict(zip(codes, style['hatches'][:len(codes)]))
+        elif self.kind == 'bubble':
+            self.df = df.T
+            self.df_den = density_matrix(self.df, self.area if self.area is not None else area_path,
+                                         self.spec['scale'])
+        else:
+            self.df = df.T
+            self.x_axis = np.arange(len(self.df.index))
+            self.values = self.df.to_numpy()
+        self.ylim = self.spec['ylim'] or (0, 1.1 * np.nanmax(df.to_numpy()))
+
+    def init_plot(self):
+        """init_plot
+
+         This function create the static part of the plot only once (axes, labels, title)
+         and the empty artists which are changed in every frame by update_plot
+
+         Args:
+             None
+
+         Returns:
+             (list): list of the artists changed in every frame
+             """
+        ax = self.ax
+        spec = self.spec
+        ax.clear()
+        if self.kind == 'bar':
+            if 'colors' in spec['style']:
+                self.artists = init_bars(ax, hidden=5)
+            else:
+                self.artists = init_bars(ax, hidden=5, color='white', edgecolor='black')
+            ax.get_xaxis().set_ticks([])
+            n_labels = 10
+            label_style = {'weight': 600, 'fontsize': 18, 'clip_on': True}
+        else:
+            if self.kind == 'bubble':
+                self.artists = [init_bubbles(ax, alpha=0.5)]
+            elif self.kind == 'dot':
+                self.artists = init_lines(ax, self.values.shape[1], 'o', alpha=0.3)
+            else:
+                self.artists = init_lines(ax, self.values.shape[1])
+            ax.set_xlabel('Year', fontsize=18, weight=600,)
+            n_labels = len(self.df.columns)
+            label_style = {'weight': 300, 'fontsize': 14}
+        ax.set_ylabel(spec['ylabel'], fontsize=18, weight=600,)
+        ax.set_ylim(*self.ylim)
+        if self.kind != 'bar':
+            ax.set_xlim(*spec['xlim'])
+            ax.set_xticks(spec['xticks'][0])
+            ax.set_xticklabels(str(x) for x in spec['xticks'][1])
+        text, size, weight = spec['title']
+        ax.set_title(text, size=size, weight=weight)
+        self.labels = init_labels(ax, n_labels, ha='right', visible=True, **label_style)
+        self.year_text = ax.text(0.05, 0.85, '', transform=ax.transAxes, size=46)
+        return self.artists + self.labels + [self.year_text]
+
+    def update_plot(self, i):
+        """update_plot
+
+         This function change the artists created by init_plot for one frame
+
+         Args:
+             i (int): the number of frames (steps frames per year for the bars)
+
+         Returns:
+             (list): list of the artists changed in the frame
+             """
+        if self.kind == 'bar':
+            codes_frame = self.frame_codes[i]
+            places = self.frame_places[i]
+            if 'colors' in self.spec['style']:
+                update_bars(self.artists, self.frame_values[i], colors=[self.colors.get(x) for x in codes_frame],
+                            places=places)
+            else:
+                update_bars(self.artists, self.frame_values[i],
+                            hatches=[self.shapes.get(x, '') for x in codes_frame], places=places)
+            update_labels(self.labels, places + 0.15, self.frame_values[i], codes_frame)
+        elif self.kind == 'bubble':
+            values_year = self.df.loc[self.years[i]].to_numpy()
+            update_bubbles(self.artists[0], [i] * len(values_year), values_year,
+                           self.df_den.loc[self.years[i]])
+            update_labels(self.labels, [i + 3] * len(values_year), values_year - 5, self.df.columns)
+        else:
+            grow_lines(self.artists, self.x_axis, self.values, i)
+            update_labels(self.labels, [i + 4] * self.values.shape[1], self.values[i] + 0.3,
+                          self.df.columns)
+        self.year_text.set_text(self.frame_years[i])
+        return self.artists + self.labels + [self.year_text]
+
+    def create_plot(self, i):
+        """create_plot
+
+         This function clear the axes and create the whole plot of the year again,
+         the way the plots were drawn before init_plot and update_plot (to compare them)
+
+         Args:
+             i (int): the number of the year
+
+         Returns:
+             None
+             """
+        self.init_plot()
+        self.update_plot(i * self.steps)
+
+    def animation(self):
+        """animation
+
+         This function create the animation of the plot
+
+         Args:
+             None
+
+         Returns:
+             ani (FuncAnimation): the animation
+             """
+        ani = FuncAnimation(self.fig, self.update_plot, init_func=self.init_plot,
+                            frames=len(self.frame_years), blit=True)
+        return ani
+
+    def save(self, path, writer, frames=None):
+        """save
+
+         This function save the animation with the writer. The frames are made here
+         (update_plot and grab_frame of the writer) instead of ani.save, which draws
+         the whole figure for every frame even with blit, so with the writers which
+         rasterize the static part only once (see StaticLayer) the figure is drawn only once
+
+         Args:
+             path (str): path to the output file
+             writer (MovieWriter): the writer from writers.py
+             frames (list): the numbers of the frames, None for all
+
+         Returns:
+             None
+             """
+        for artist in self.init_plot():
+            artist.set_animated(True)
+        with writer.saving(self.fig, path, self.fig.dpi):
+            for i in frames if frames is not None else range(len(self.frame_years)):
+                self.update_plot(i)
+                writer.grab_frame()
+
+    def save_plot(self, images='../images', encoder=None):
+        """save_plot
+
+         This function save the animated plot as mp4 and gif file at once,
+         the static part of the plot is rasterized only once and the frames
+         are written to ffmpeg while the next ones are drawn. The gif gets only
+         the frames of the years (the tweened frames would make it a few times bigger).
+         With the encoder only one file is saved with this encoder (see writers.encoders)
+
+         Args:
+             images (str): the folder for the files
+             encoder (str): the name of the encoder (for example vp9 or pillow-gif),
+                            None for the mp4 and the gif file
+
+         Returns:
+             None
+             """
+        if encoder is None:
+            writer = PipelinedWriter('%s/%s.gif' % (images, self.name), fps=self.fps, gif_step=self.steps)
+            self.save('%s/%s.mp4' % (images, self.name), writer)
+            return
+        if encoder == 'pillow-gif':
+            writer = PillowGifWriter(fps=self.fps)
+        else:
+            writer = EncoderWriter(encoder, fps=self.fps)
+        self.save('%s/%s.%s' % (images, self.name, encoders[encoder]['ext']), writer)
+
+
+def find_spec(name):
+    """find_spec
+
+     This function return the specification of the plot
+
+     Args:
+         name (str): the name of the plot (for example fig1)
+
+     Returns:
+         (dict): the specification from specs.py
+         """
+    for spec in specs:
+        if spec['name'] == name:
+            return spec
+    raise ValueError('unknown plot: %s' % name)
+
+
+def make_plot(name, df=None, area=None):
+    """make_plot
+
+     This function create one plot by its name (for the scripts which draw
+     the frames themselves), the data is read if it is not given
+
+     Args:
+         name (str): the name of the plot (for example fig1)
+         df (dataframe): the dataframe from load_data or None
+         area (dataframe): the dataframe from read_area or None
+
+     Returns:
+         (Plot): the plot before prepare_data
+         """
+    df = load_data() if df is None else df
+    area = read_area(area_path) if area is None else area
+    return Plot(find_spec(name), df, area)
+
+
+def render(names=None, images='../images', encoder=None):
+    """render
+
+     This function read the data once and save all plots with the given names
+
+     Args:
+         names (list): names of the plots (for example fig1), None for all plots
+         images (str): the folder for the files
+         encoder (str): the name of the encoder from writers.encoders, None for the mp4 and the gif file
+
+     Returns:
+         None
+         """
+    df = load_data()
+    area = read_area(area_path)
+    for spec in specs:
+        if names and spec['name'] not in names:
+            continue
+        plot = Plot(spec, df, area)
+        plot.prepare_data()
+        plot.save_plot(images, encoder)
+        plt.close(plot.fig)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Save the animated plots')
+    parser.add_argument('names', nargs='*', help='the plots, for example fig1 (default: all)')
+    parser.add_argument('--images', default='../images', help='the folder for the files')
+    parser.add_argument('--encoder', choices=list(encoders),
+                        help='save one file with this encoder instead of the mp4 and the gif file')
+    args = parser.parse_args()
+    render(args.names, args.images, args.encoder)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,177 +4,15 @@ Patrycja Owczarek
 Script for animated plot creation:
 pick one country and year at random and then find 4 other countries that are the closest by
 population size in given year and do similar plot.
+The plot is described in specs.py and made by engine.py
 """
 
-import matplotlib.pyplot as plt
-import ffmpy
-from matplotlib.animation import FuncAnimation
-import pycountry as pc
-import pandas as pd
-
-global df
-global years
-fig, ax = plt.subplots(figsize=(12, 8))
-
-years = list(range(1961, 2019))
-years = [str(x) for x in years]
-
-def read_file(df_path):
-    """read_file
-
-     This function read the .csv file and save it as the dataframe
-
-     Args:
-         df_path (str): string contains path to the .csv dataset
-
-     Returns:
-         df (dataframe): the dataframe contains all data from .csv file
-         """
-    df = pd.read_csv(df_path, sep=',', skiprows=3)
-    return df
-
-
-def clean_dataframe(df):
-    """clean_dataframe
-
-     This function clean the dataframe:
-     - delete all non-country rows
-     - delete unimportant columns
-     - change population to millions
-     - transpose the dataframe
-
-     Args:
-         df (dataframe): dataframe contains the data for cleaning
-
-     Returns:
-         df (dataframe): the dataframe cleaned of all unnecessary data
-         """
-    df = read_file(df)
-    country_codes = list(df['Country Code'])
-    to_delete = []
-    for country in country_codes:
-        if pc.countries.get(alpha_3=country) is None:
-            to_delete.append(country)
-    df = df[df['Country Code'].isin(to_delete) == False]
-    df = df.drop(columns=['Indicator Code', 'Indicator Name', '2020','Unnamed: 65', 'Country Name'])
-    df = get_countries(df)
-    df = df.set_index('Country Code')
-    df = df.dropna()
-    df = df.T
-    df = df.div(1000000)
-    for col in df.select_dtypes(include=['object']).columns:
-        df[col] = df[col].astype(float)
-    return df
-
-def get_countries(df):
-    """get_countires
-
-     This function read the dataframe. Then based on the parameter year and country
-     its search the df for 5 closest to parameters in population countries and shrink the dataset
-     to these 5 countries.
-
-     Args:
-         df (dataframe): dataframe contains the data from partial cleaning
-
-     Returns:
-         df (dataframe): the dataframe with population for only 5 countries
-         """
-    year = '1984'
-    sorted_1984 = df.sort_values(by=year, ignore_index=True)
-    ind = sorted_1984.index[sorted_1984['Country Code'] == 'JPN'].tolist()
-    df = sorted_1984.iloc[ind[0]:ind[0] + 5]
-    return df
-
-
-
-def create_plot(i):
-    """create_plot
-
-     This function read the dataframe and create the animated bubble plot:
-     - x axis contains country, y axis population (in millions)
-     - the plot shows only 5 countries
-     - the plot is saved as mp4 file in images folder
-     - the size of the bubble is density of countries
-
-     Args:
-         i (int): the number of frames (years)
-
-     Returns:
-         None
-         """
-    global df
-    global years
-    ax.clear()
-    year = years[i]
-    df_year = df.iloc[:i+2,:]
-    df_den = calculate_density(df_year, years[i])
-    x_axis = ([i] * len(df_year.loc[years[i],:]))
-    ax.scatter(x_axis, df_year.loc[years[i], :],
-               s=df_den, alpha=0.5)
-    ax.set_xlabel('Year', fontsize=18, weight=600,)
-    ax.set_ylabel('Population [mln]', fontsize=18, weight=600,)
-    ax.set_ylim(0, 400)
-    ax.set_xlim(-3, 60)
-    ax.set_xticks(range(0, 59, 10))
-    ax.set_xticklabels(str(x) for x in (range(1960, 2020, 10)))
-    ax.set_title('Countries most similar to population of Japan in 1984', size=30, weight=400)
-    x_pos = i+3
-    for k, (name, value) in enumerate(zip(df_year.columns, df_year.loc[years[i],:])):
-        ax.text(x_pos,  value-5, name, ha='right', weight=300, visible=True, fontsize=14)
-    ax.text(0.05, 0.85, year, transform=ax.transAxes, size=46)
-
-
-def calculate_density(df_year, year):
-    """calculate_density
-
-     This function read the row for one year in population and area of country
-     and return the list containing the density of each country
-
-     Args:
-         df_year (dataframe): data with the population of each country
-         year (str): year for calculating the density
-
-     Returns:
-         df_den (list): list containing density for each country for one year
-         """
-    density = pd.read_csv('../data/API_AG.LND.TOTL.K2_DS2_en_csv_v2_2164047.csv', sep=',', skiprows=3)
-    df_den = []
-    for col in list(df_year.columns):
-        cell = density.loc[density["Country Code"] == col, year].iloc[0]
-        cell = (df_year[col].iloc[-1] * 1000000)/ cell
-        df_den.append(cell)
-    return df_den
-
-
-
-def save_gif():
-    """save_gif
-
-     This function read the created mp4 plot and convert it to gif file.
-     The gif is saved in images folder
-
-     Args:
-         None
-
-     Returns:
-         None
-         """
-    ff = ffmpy.FFmpeg(
-        inputs={"../images/fig11.mp4": None},
-        outputs={"../images/fig11.gif": None})
-    ff.run()
+from engine import render
 
 
 def main():
-    global df
-    global years
-    df = clean_dataframe('../data/API_SP.POP.TOTL_DS2_en_csv_v2_2106202.csv')
-    ani = FuncAnimation(fig, create_plot, frames=len(years))
-    ani.save('../images/fig11.mp4')
-    save_gif()
+    render(['fig11'])
 
 
 if __name__ == "__main__":
     main()
-
-
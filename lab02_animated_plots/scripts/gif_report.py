@@ -0,0 +1,195 @@
+"""
+Data Analysis and Visualization, lab 2
+Patrycja Owczarek
+Script for comparing the gif outputs: the frames of the plot are drawn only once
+to a raw file and encoded to the gif the way it was made before (the mp4 file of
+matplotlib converted by ffmpeg) and with the new filter graphs.
+For every gif the size, the encode time, the number of frames and the mean error
+against the drawn frames are printed, with the size of the gif in ../images.
+The lossy gif is made only if gifsicle is installed.
+
+python gif_report.py fig1 fig11 --lossy 80
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+from PIL import Image
+
+from engine import make_plot
+from renderer import StaticLayer
+from writers import gif_filter, lossy_gif, mp4_args, pipe_args
+
+
+def variants(lossy=None):
+    """variants
+
+     This function return the gif outputs to compare: before is the gif made the way
+     the scripts did it (ani.save with the default settings of matplotlib to mp4 and
+     ffmpeg with its default settings from mp4 to gif), dedup is the gif of save_plot
+
+     Args:
+         lossy (int): the --lossy of gifsicle, None for no lossy gif
+
+     Returns:
+         (dict): the name of the output -> (filter graph, lossy)
+         """
+    result = {'before': (None, None),
+              'palette': (gif_filter(), None),
+              'dedup': (gif_filter(dedup=True), None),
+              'colors64': (gif_filter(colors=64, dedup=True), None)}
+    if lossy is not None and shutil.which('gifsicle'):
+        result['lossy%d' % lossy] = (gif_filter(dedup=True), lossy)
+    return result
+
+
+def draw_frames(name, path):
+    """draw_frames
+
+     This function draw all frames of the plot (init_plot and update_plot)
+     and write them as RGBA to the raw file
+
+     Args:
+         name (str): the name of the plot (for example fig11)
+         path (str): path to the raw file
+
+     Returns:
+         fps (int): frames per second of the plot
+         frame_size (tuple): width and height of the frame in pixels
+         """
+    plot = make_plot(name)
+    plot.prepare_data()
+    for artist in plot.init_plot():
+        artist.set_animated(True)
+    layer = StaticLayer(plot.fig)
+    with open(path, 'wb') as file:
+        for i in range(len(plot.frame_years)):
+            plot.update_plot(i)
+            frame = layer.draw()
+            file.write(frame.data)
+    plt.close(plot.fig)
+    return plot.fps, (frame.shape[1], frame.shape[0])
+
+
+def encode(raw, frame_size, fps, graph, gif, lossy=None):
+    """encode
+
+     This function encode the raw frames to the gif file
+
+     Args:
+         raw (str): path to the raw file
+         frame_size (tuple): width and height of the frame in pixels
+         fps (int): frames per second
+         graph (str): the filter graph of the gif from gif_filter, None for the gif made before
+                      (the mp4 file of matplotlib converted to gif by ffmpeg)
+         gif (str): path to the output gif file
+         lossy (int): the --lossy of gifsicle or None
+
+     Returns:
+         (float): the encode time in seconds
+         """
+    start = time.perf_counter()
+    if graph is None:
+        mp4 = os.path.splitext(gif)[0] + '.mp4'
+        subprocess.run(pipe_args(frame_size, fps, raw) + mp4_args() + ['-y', mp4], check=True)
+        subprocess.run([matplotlib.rcParams['animation.ffmpeg_path'], '-loglevel', 'error',
+                        '-i', mp4, '-y', gif], check=True)
+        os.remove(mp4)
+    else:
+        subprocess.run(pipe_args(frame_size, fps, raw) +
+                       ['-filter_complex', 'null[g];' + graph, '-map', '[gif]', '-y', gif], check=True)
+    if lossy is not None:
+        lossy_gif(gif, lossy)
+    return time.perf_counter() - start
+
+
+def gif_error(gif, raw, frame_size, fps):
+    """gif_error
+
+     This function compare the frames of the gif with the drawn frames,
+     the longer frames of the gif are compared with all frames they replace
+
+     Args:
+         gif (str): path to the gif file
+         raw (str): path to the raw file
+         frame_size (tuple): width and height of the frame in pixels
+         fps (int): frames per second
+
+     Returns:
+         frames (int): the number of frames in the gif
+         error (float): the mean absolute difference of the RGB values (0-255)
+         """
+    width, height = frame_size
+    drawn = np.memmap(raw, dtype=np.uint8, mode='r').reshape(-1, height, width, 4)
+    errors = []
+    k = 0
+    with Image.open(gif) as image:
+        for frame in range(image.n_frames):
+            image.seek(frame)
+            rgb = np.asarray(image.convert('RGB'), dtype=np.int16)
+            repeat = max(1, round(image.info['duration'] * fps / 1000))
+            for _ in range(min(repeat, len(drawn) - k)):
+                errors.append(np.abs(rgb - drawn[k, :, :, :3]).mean())
+                k += 1
+        frames = image.n_frames
+    return frames, float(np.mean(errors))
+
+
+def report(names, lossy=None, images='../images'):
+    """report
+
+     This function print the size, the encode time, the number of frames and
+     the error of every gif output of every script
+
+     Args:
+         names (list): the names of the scripts
+         lossy (int): the --lossy of gifsicle, None for no lossy gif
+         images (str): the folder with the saved gif files
+
+     Returns:
+         results (dict): the name of the script -> the name of the output -> the results
+         """
+    if lossy is not None and not shutil.which('gifsicle'):
+        print('gifsicle is not installed, no lossy gif')
+    results = {}
+    print('%-8s%-12s%10s%10s%8s%8s%8s' % ('script', 'gif', 'size kB', 'before', 'time s', 'frames', 'error'))
+    with tempfile.TemporaryDirectory() as folder:
+        raw = os.path.join(folder, 'frames.rgba')
+        for name in names:
+            fps, frame_size = draw_frames(name, raw)
+            saved = os.path.join(images, name + '.gif')
+            if os.path.exists(saved):
+                print('%-8s%-12s%10.0f' % (name, 'saved', os.path.getsize(saved) / 1000))
+            results[name] = {}
+            for variant, (graph, level) in variants(lossy).items():
+                gif = os.path.join(folder, '%s_%s.gif' % (name, variant))
+                seconds = encode(raw, frame_size, fps, graph, gif, level)
+                frames, error = gif_error(gif, raw, frame_size, fps)
+                size = os.path.getsize(gif)
+                results[name][variant] = {'size': size, 'seconds': seconds, 'frames': frames, 'error': error}
+                before = results[name]['before']
+                print('%-8s%-12s%10.0f%9.0f%%%8.2f%8d%8.2f' % (name, variant, size / 1000,
+                                                             100 * size / before['size'], seconds,
+                                                             frames, error))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the size and the encode time of the gif outputs')
+    parser.add_argument('names', nargs='*', default=['fig%d' % k for k in range(1, 16)],
+                        help='the scripts (default: all)')
+    parser.add_argument('--lossy', type=int, help='the --lossy of gifsicle (if installed)')
+    args = parser.parse_args()
+    report(args.names, args.lossy)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Data Analysis and Visualization, lab 2
+Patrycja Owczarek
+Helper module for the plots of countries similar in population:
+Sort the population of every year once and keep the permutation back to the
+countries, so the countries closest to any country in any year are found
+with searchsorted instead of sorting the whole dataframe again
+"""
+
+import numpy as np
+
+
+class PopulationIndex:
+    """PopulationIndex
+
+     The population of every year sorted ascending (missing data at the end, like
+     df.sort_values) with the permutation back to the rows of the dataframe.
+
+     Args:
+         df (dataframe): dataframe with one row for every country and years as columns,
+                         the codes are taken from the 'Country Code' column or from the index
+         years (list): list of the years (columns) to index, None for all year columns
+     """
+
+    def __init__(self, df, years=None):
+        if years is None:
+            years = [x for x in df.columns if str(x).isdigit()]
+        if 'Country Code' in df.columns:
+            self.codes = df['Country Code'].to_numpy()
+        else:
+            self.codes = df.index.to_numpy()
+        self.years = [str(x) for x in years]
+        self.columns = {year: k for k, year in enumerate(self.years)}
+        self.rows = {code: k for k, code in enumerate(self.codes)}
+        values = df[years].to_numpy(dtype=float)
+        self.order = np.argsort(values, axis=0, kind='stable')
+        self.sorted = np.take_along_axis(values, self.order, axis=0)
+        self.ranks = np.empty(self.order.shape, dtype=np.intp)
+        np.put_along_axis(self.ranks, self.order, np.arange(len(self.codes))[:, None], axis=0)
+        self.counts = np.count_nonzero(~np.isnan(values), axis=0)
+
+    def position(self, country, year):
+        """position
+
+         This function find the place of the country in the sorted population of the year
+
+         Args:
+             country (str): the country code
+             year (str): the year
+
+         Returns:
+             (int): the position, 0 is the least populated country
+             """
+        return int(self.ranks[self.rows[country], self.columns[str(year)]])
+
+    def around(self, country, year, start=0, stop=5):
+        """around
+
+         This function return the countries from start to stop places from the country
+         in the sorted population of the year, the same as
+         df.sort_values(by=year).iloc[ind + start:ind + stop]
+
+         Args:
+             country (str): the country code
+             year (str): the year
+             start (int): the first place (relative to the country, can be negative)
+             stop (int): the place after the last one (relative to the country)
+
+         Returns:
+             rows (ndarray): row numbers of the countries in the dataframe
+             """
+        col = self.columns[str(year)]
+        ind = self.ranks[self.rows[country], col]
+        return self.order[max(ind + start, 0):max(ind + stop, 0), col]
+
+    def nearest(self, country, year, k=5):
+        """nearest
+
+         This function find k countries with the population closest to the population
+         of the country in the year (the country itself is the first of them)
+
+         Args:
+             country (str): the country code
+             year (str): the year
+             k (int): the number of countries
+
+         Returns:
+             rows (ndarray): row numbers of the countries, from the closest
+             """
+        col = self.columns[str(year)]
+        return self.nearest_value(self.sorted[self.position(country, year), col], year, k)
+
+    def nearest_value(self, value, year, k=5):
+        """nearest_value
+
+         This function find k countries with the population closest to the value
+         in the year: searchsorted gives the place of the value and the next countries
+         are taken from both sides, so it is O(log n + k)
+
+         Args:
+             value (float): the population
+             year (str): the year
+             k (int): the number of countries
+
+         Returns:
+             rows (ndarray): row numbers of the countries, from the closest
+             """
+        col = self.columns[str(year)]
+        column = self.sorted[:self.counts[col], col]
+        lo = int(np.searchsorted(column, value)) - 1
+        hi = lo + 1
+        places = []
+        while len(places) < k and (lo >= 0 or hi < len(column)):
+            if hi >= len(column) or (lo >= 0 and value - column[lo] <= column[hi] - value):
+                places.append(lo)
+                lo -= 1
+            else:
+                places.append(hi)
+                hi += 1
+        return self.order[np.array(places, dtype=np.intp), col]
+
+    def nearest_all(self, k=5):
+        """nearest_all
+
+         This function find k closest countries for all countries and all years at once
+
+         Args:
+             k (int): the number of countries (with the country itself)
+
+         Returns:
+             rows (ndarray): matrix (countries x years x k) with row numbers of the closest
+                             countries, -1 if there is no data for the country or year
+             """
+        cols = np.arange(len(self.years))
+        values = np.take_along_axis(self.sorted, self.ranks, axis=0)
+        places = self._expand(self.ranks - 1, self.ranks.copy(), values, cols, k)
+        rows = np.where(places >= 0, self.order[np.maximum(places, 0), cols[None, :, None]], -1)
+        rows[np.isnan(values)] = -1
+        return rows
+
+    def _expand(self, lo, hi, values, cols, k):
+        """_expand
+
+         This function walk from the place of the value to both sides of the sorted
+         population at once for many queries, every step takes the closer side
+
+         Args:
+             lo (ndarray): the first place below the value for every query
+             hi (ndarray): the first place above (or at) the value for every query
+             values (ndarray): the population of every query
+             cols (ndarray): the column of the year of every query (broadcast with lo)
+             k (int): the number of places
+
+         Returns:
+             places (ndarray): lo.shape x k places in the sorted population, -1 if missing
+             """
+        counts = self.counts[cols]
+        places = np.full(lo.shape + (k,), -1, dtype=np.intp)
+        for step in range(k):
+            below = np.where(lo >= 0, values - self.sorted[np.maximum(lo, 0), cols], np.inf)
+            top = np.minimum(hi, len(self.codes) - 1)
+            above = np.where(hi < counts, self.sorted[top, cols] - values, np.inf)
+            take_lo = below <= above
+            found = np.isfinite(np.minimum(below, above))
+            places[..., step] = np.where(found, np.where(take_lo, lo, hi), -1)
+            lo = np.where(found & take_lo, lo - 1, lo)
+            hi = np.where(found & ~take_lo, hi + 1, hi)
+        return places
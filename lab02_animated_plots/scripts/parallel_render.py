@@ -0,0 +1,158 @@
+"""
+Data Analysis and Visualization, lab 2
+Patrycja Owczarek
+Script for rendering the animated plots in parallel:
+the frames are split between the processes of a pool, every process has its own
+figure and draws the frames into shared memory. The main process writes the frames
+in order to one ffmpeg process, so the mp4 file is the same as from ani.save
+(the gif file is encoded by the same ffmpeg process)
+"""
+
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+from engine import make_plot
+from renderer import StaticLayer
+from tween import frame_count
+from writers import ffmpeg_args, open_ffmpeg, close_ffmpeg
+
+global plot
+global layer
+global memory
+global frames
+
+
+def frame_shape(fig):
+    """frame_shape
+
+     This function return the shape of the RGBA array with one frame of the figure
+
+     Args:
+         fig (Figure): the figure of the plot
+
+     Returns:
+         (tuple): height, width and 4 channels
+         """
+    width, height = fig.canvas.get_width_height()
+    return height, width, 4
+
+
+def init_worker(name, memory_name, slots):
+    """init_worker
+
+     This function is called once in every process of the pool. It create the plot
+     (so the process has its own figure), prepare the data and the static part of the plot
+     and attach the shared memory for the frames
+
+     Args:
+         name (str): the name of the plot (for example fig1)
+         memory_name (str): the name of the shared memory
+         slots (int): the number of frames which fit in the shared memory
+
+     Returns:
+         None
+         """
+    global plot
+    global layer
+    global memory
+    global frames
+    plot = make_plot(name)
+    plot.prepare_data()
+    for artist in plot.init_plot():
+        artist.set_animated(True)
+    layer = StaticLayer(plot.fig)
+    memory = shared_memory.SharedMemory(name=memory_name)
+    frames = np.ndarray((slots,) + frame_shape(plot.fig), dtype=np.uint8, buffer=memory.buf)
+
+
+def render_frame(i, slot):
+    """render_frame
+
+     This function draw one frame and copy its pixels to the slot of the shared memory
+
+     Args:
+         i (int): the number of frame (year)
+         slot (int): the number of slot in the shared memory
+
+     Returns:
+         i (int): the number of frame
+         """
+    global plot
+    global layer
+    global frames
+    plot.update_plot(i)
+    frames[slot] = layer.draw()
+    return i
+
+
+def render(name, output, fps=None, workers=None, gif=None):
+    """render
+
+     This function render all frames of the plot in the pool of processes and
+     write them in order to ffmpeg. At most 2 frames per process are waiting in
+     the shared memory, the next frame is started when the oldest one is written.
+     If a frame fails, ffmpeg is stopped and the shared memory is released
+
+     Args:
+         name (str): the name of the plot (for example fig1)
+         output (str): path to the output mp4 file
+         fps (int): frames per second, None for the fps of the plot
+         workers (int): the number of processes, None for the number of cores
+         gif (str): path to the output gif file (encoded from the same frames) or None
+
+     Returns:
+         None
+         """
+    plot = make_plot(name)
+    n_frames = frame_count(len(plot.years), plot.steps)
+    shape = frame_shape(plot.fig)
+    fps = fps or plot.fps
+    plt.close(plot.fig)
+    workers = workers or os.cpu_count()
+    slots = 2 * workers
+    memory = shared_memory.SharedMemory(create=True, size=slots * int(np.prod(shape)))
+    frames = np.ndarray((slots,) + shape, dtype=np.uint8, buffer=memory.buf)
+    proc = None
+    try:
+        proc = open_ffmpeg(ffmpeg_args(output, (shape[1], shape[0]), fps, gif, gif_step=plot.steps))
+        with ProcessPoolExecutor(workers, initializer=init_worker,
+                                 initargs=(name, memory.name, slots)) as pool:
+            pending = deque()
+            for i in range(n_frames):
+                if len(pending) == slots:
+                    done = pending.popleft().result()
+                    proc.stdin.write(frames[done % slots].data)
+                pending.append(pool.submit(render_frame, i, i % slots))
+            while pending:
+                done = pending.popleft().result()
+                proc.stdin.write(frames[done % slots].data)
+        close_ffmpeg(proc)
+        proc = None
+    finally:
+        if proc is not None:
+            proc.kill()
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+            proc.wait()
+        del frames
+        memory.close()
+        memory.unlink()
+
+
+def main():
+    for name in sys.argv[1:]:
+        render(name, '../images/%s.mp4' % name, gif='../images/%s.gif' % name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+/*
+Data Analysis and Visualization, lab 2
+Patrycja Owczarek
+The player of the animated plots exported by player.py: the population of every year
+is drawn on the canvas in the browser (the same layout as the matplotlib figure 12x8 inches),
+so the page loads only the data instead of the mp4 or gif file.
+Click the plot to stop or start the animation, players[id].show(frame) draws one frame.
+
+<canvas id="fig1" width="1200" height="800"></canvas>
+<script src="player.js"></script>
+<script src="fig1.js"></script>
+*/
+
+var players = {};
+
+function drawPlot(id, data) {
+    var canvas = document.getElementById(id);
+    var ctx = canvas.getContext('2d');
+    var pt = canvas.width / 12 / 72;
+    var box = {left: 0.125 * canvas.width, right: 0.9 * canvas.width,
+               top: 0.12 * canvas.height, bottom: 0.89 * canvas.height};
+    var xlim = data.xlim, ylim = data.ylim;
+    var frames = data.kind === 'bar' ? (data.years.length - 1) * data.steps + 1 : data.years.length;
+    var player = {frame: 0, playing: true};
+    players[id] = player;
+
+    function px(x) { return box.left + (x - xlim[0]) / (xlim[1] - xlim[0]) * (box.right - box.left); }
+    function py(y) { return box.bottom - (y - ylim[0]) / (ylim[1] - ylim[0]) * (box.bottom - box.top); }
+
+    function font(size, weight) { return (weight || 'normal') + ' ' + size * pt + 'px DejaVu Sans, sans-serif'; }
+
+    function text(s, x, y, size, weight, align, baseline) {
+        ctx.font = font(size, weight);
+        ctx.textAlign = align || 'left';
+        ctx.textBaseline = baseline || 'alphabetic';
+        ctx.fillText(s, x, y);
+    }
+
+    function niceTicks(lo, hi) {
+        var step = Math.pow(10, Math.floor(Math.log10((hi - lo) / 5)));
+        var steps = [1, 2, 2.5, 5, 10];
+        for (var k = 0; k < steps.length; k++) {
+            if ((hi - lo) / (steps[k] * step) <= 9) { step *= steps[k]; break; }
+        }
+        var ticks = [];
+        for (var y = Math.ceil(lo / step) * step; y <= hi + 1e-9; y += step) ticks.push(Math.round(y * 1e6) / 1e6);
+        return ticks;
+    }
+
+    function hatchPattern(hatch) {
+        var size = 24, tile = document.createElement('canvas');
+        tile.width = tile.height = size;
+        var c = tile.getContext('2d');
+        c.fillStyle = 'white';
+        c.fillRect(0, 0, size, size);
+        c.strokeStyle = 'black';
+        c.fillStyle = 'black';
+        c.lineWidth = 1;
+        for (var k = 0; k < hatch.length; k++) {
+            var h = hatch[k];
+            c.beginPath();
+            if (h === '/' || h === 'x') { c.moveTo(0, size); c.lineTo(size, 0); }
+            if (h === '\\' || h === 'x') { c.moveTo(0, 0); c.lineTo(size, size); }
+            if (h === '|' || h === '+') { c.moveTo(size / 2, 0); c.lineTo(size / 2, size); }
+            if (h === '-' || h === '+' || h === '_') { c.moveTo(0, size / 2); c.lineTo(size, size / 2); }
+            c.stroke();
+            if (h === '.' || h === '*') { c.fillRect(size / 4, size / 4, 3, 3); c.fillRect(3 * size / 4, 3 * size / 4, 3, 3); }
+            if (h === 'o' || h === 'O') {
+                c.beginPath();
+                c.arc(size / 2, size / 2, h === 'o' ? size / 6 : size / 3, 0, 2 * Math.PI);
+                c.stroke();
+            }
+        }
+        return ctx.createPattern(tile, 'repeat');
+    }
+
+    var patterns = {};
+    if (data.hatches) {
+        for (var code in data.hatches) patterns[code] = hatchPattern(data.hatches[code]);
+    }
+
+    function drawAxes() {
+        ctx.fillStyle = 'white';
+        ctx.fillRect(0, 0, canvas.width, canvas.height);
+        ctx.fillStyle = 'black';
+        ctx.strokeStyle = 'black';
+        ctx.lineWidth = 0.8 * pt;
+        ctx.strokeRect(box.left, box.top, box.right - box.left, box.bottom - box.top);
+        niceTicks(ylim[0], ylim[1]).forEach(function (y) {
+            ctx.beginPath();
+            ctx.moveTo(box.left, py(y));
+            ctx.lineTo(box.left - 3.5 * pt, py(y));
+            ctx.stroke();
+            text(String(y), box.left - 5 * pt, py(y), 10, 'normal', 'right', 'middle');
+        });
+        if (data.xticks) {
+            data.xticks[0].forEach(function (x, k) {
+                ctx.beginPath();
+                ctx.moveTo(px(x), box.bottom);
+                ctx.lineTo(px(x), box.bottom + 3.5 * pt);
+                ctx.stroke();
+                text(data.xticks[1][k], px(x), box.bottom + 5 * pt, 10, 'normal', 'center', 'top');
+            });
+            text('Year', (box.left + box.right) / 2, canvas.height - 18 * pt, 18, 'bold', 'center', 'bottom');
+        }
+        ctx.save();
+        ctx.translate(box.left - 50 * pt, (box.top + box.bottom) / 2);
+        ctx.rotate(-Math.PI / 2);
+        text(data.ylabel, 0, 0, 18, 'bold', 'center', 'bottom');
+        ctx.restore();
+        text(data.title[0], (box.left + box.right) / 2, box.top - 6 * pt, data.title[1],
+             data.title[2], 'center', 'bottom');
+    }
+
+    function clip() {
+        ctx.save();
+        ctx.beginPath();
+        ctx.rect(box.left, box.top, box.right - box.left, box.bottom - box.top);
+        ctx.clip();
+    }
+
+    function drawBars(frame) {
+        var year = Math.floor(frame / data.steps);
+        var next = Math.min(year + 1, data.years.length - 1);
+        var t = (frame % data.steps) / data.steps;
+        var eased = t * t * (3 - 2 * t);
+        clip();
+        data.countries.forEach(function (code, k) {
+            if (!data.shown[k][year] && !data.shown[k][next]) return;
+            var a = data.places[k][year], b = data.places[k][next];
+            var place = a + (b - a) * eased;
+            var value = data.values[k][year] + (data.values[k][next] - data.values[k][year]) * t;
+            var x0 = px(place - 0.4), x1 = px(place + 0.4);
+            ctx.fillStyle = data.colors ? data.colors[code] : patterns[code] || 'white';
+            ctx.fillRect(x0, py(value), x1 - x0, py(0) - py(value));
+            if (!data.colors) {
+                ctx.lineWidth = pt;
+                ctx.strokeStyle = 'black';
+                ctx.strokeRect(x0, py(value), x1 - x0, py(0) - py(value));
+            }
+            ctx.fillStyle = 'black';
+            text(code, px(place + 0.15), py(value), 18, 'bold', 'right');
+        });
+        ctx.restore();
+    }
+
+    function drawLines(frame) {
+        clip();
+        data.countries.forEach(function (code, k) {
+            var color = data.colors[k % data.colors.length];
+            ctx.strokeStyle = color;
+            ctx.fillStyle = color;
+            if (data.kind === 'line') {
+                ctx.lineWidth = 1.5 * pt;
+                ctx.beginPath();
+                for (var i = 0; i <= frame; i++) {
+                    if (data.values[k][i] === null) continue;
+                    ctx.lineTo(px(i), py(data.values[k][i]));
+                }
+                ctx.stroke();
+            } else {
+                ctx.globalAlpha = 0.3;
+                for (var j = 0; j <= frame; j++) {
+                    if (data.values[k][j] === null) continue;
+                    ctx.beginPath();
+                    ctx.arc(px(j), py(data.values[k][j]), 3 * pt, 0, 2 * Math.PI);
+                    ctx.fill();
+                }
+                ctx.globalAlpha = 1;
+            }
+        });
+        ctx.restore();
+        ctx.fillStyle = 'black';
+        data.countries.forEach(function (code, k) {
+            if (data.values[k][frame] !== null) text(code, px(frame + 4), py(data.values[k][frame] + 0.3), 14, '300', 'right');
+        });
+    }
+
+    function drawBubbles(frame) {
+        clip();
+        ctx.fillStyle = data.colors[0];
+        ctx.globalAlpha = 0.5;
+        data.countries.forEach(function (code, k) {
+            var value = data.values[k][frame], size = data.sizes[k][frame];
+            if (value === null || size === null) return;
+            ctx.beginPath();
+            ctx.arc(px(frame), py(value), Math.sqrt(size) / 2 * pt, 0, 2 * Math.PI);
+            ctx.fill();
+        });
+        ctx.globalAlpha = 1;
+        ctx.restore();
+        ctx.fillStyle = 'black';
+        data.countries.forEach(function (code, k) {
+            if (data.values[k][frame] !== null) text(code, px(frame + 3), py(data.values[k][frame] - 5), 14, '300', 'right');
+        });
+    }
+
+    function draw() {
+        var frame = player.frame;
+        drawAxes();
+        if (data.kind === 'bar') drawBars(frame);
+        else if (data.kind === 'bubble') drawBubbles(frame);
+        else drawLines(frame);
+        var year = data.kind === 'bar' ? data.years[Math.floor(frame / data.steps)] : data.years[frame];
+        ctx.fillStyle = 'black';
+        text(year, px(xlim[0]) + 0.05 * (box.right - box.left), box.top + 0.15 * (box.bottom - box.top),
+             46, 'normal', 'left');
+    }
+
+    var last = null;
+    function tick(now) {
+        if (last === null) last = now;
+        if (player.playing && now - last >= 1000 / data.fps) {
+            last = now;
+            player.frame = (player.frame + 1) % frames;
+            draw();
+        }
+        requestAnimationFrame(tick);
+    }
+
+    player.show = function (frame) { player.frame = frame; draw(); };
+    canvas.addEventListener('click', function () { player.playing = !player.playing; });
+    draw();
+    requestAnimationFrame(tick);
+    return player;
+}
@@ -0,0 +1,146 @@
+"""
+Data Analysis and Visualization, lab 2
+Patrycja Owczarek
+Script for exporting the animated plots as data for the browser instead of video:
+only the population of the shown countries in every year (with the labels, colors and axes)
+is saved as a small .js file and drawn on the canvas by player.js, nothing is rasterized
+or encoded. The folder gets player.js, one figN.js for every plot and index.html with all plots.
+
+python player.py fig1 fig11 --output ../images/player
+"""
+
+import argparse
+import json
+import os
+import shutil
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib.colors import to_hex
+import numpy as np
+
+from density import read_area
+from engine import Plot, load_data, area_path
+from specs import specs
+from tween import bar_places
+
+player_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'player.js')
+
+
+def rounded(matrix, decimals=3):
+    """rounded
+
+     This function change the matrix to lists of rounded numbers (None for missing data),
+     so the JSON has no more digits than the plot can show
+
+     Args:
+         matrix (ndarray): matrix (countries x years)
+         decimals (int): the number of decimals
+
+     Returns:
+         (list): list of lists with the numbers
+         """
+    matrix = np.round(np.asarray(matrix, dtype=float), decimals)
+    return [[None if np.isnan(x) else float(x) for x in row] for row in matrix]
+
+
+def plot_data(plot):
+    """plot_data
+
+     This function describe the prepared plot for the player: the axes, the title
+     and the population of the shown countries in every year. For the bars the real
+     population and the place of the country in every year are saved (out of the plot on the
+     side of the shown countries where the country is, see bar_places) with the years the
+     country is shown, and the frames between the years are made by the player, the same way as tween_bars
+
+     Args:
+         plot (Plot): the plot after prepare_data
+
+     Returns:
+         data (dict): the data which can be saved as JSON
+         """
+    spec = plot.spec
+    data = {'name': plot.name, 'kind': plot.kind, 'title': list(spec['title']), 'ylabel': spec['ylabel'],
+            'ylim': [float(x) for x in plot.ylim], 'years': plot.years, 'fps': spec['fps'],
+            'steps': plot.steps}
+    if plot.kind == 'bar':
+        df = plot.population
+        places, shown = bar_places(df, plot.years, keep=plot.keep)
+        rows = shown.any(axis=1)
+        data['countries'] = list(df.index[rows])
+        data['values'] = rounded(df.loc[rows, plot.years].to_numpy())
+        data['places'] = [[int(x) for x in row] for row in places[rows]]
+        data['shown'] = [[int(x) for x in row] for row in shown[rows]]
+        data['xlim'] = [float(x) for x in plot.ax.get_xlim()]
+        if 'colors' in spec['style']:
+            data['colors'] = {code: to_hex(plot.colors[code]) for code in data['countries'] if code in plot.colors}
+        else:
+            data['hatches'] = {code: plot.shapes.get(code, '') for code in data['countries']}
+        return data
+    data['countries'] = list(plot.df.columns)
+    data['values'] = rounded(plot.df.loc[plot.years].to_numpy().T)
+    data['xlim'] = list(spec['xlim'])
+    data['xticks'] = [list(spec['xticks'][0]), [str(x) for x in spec['xticks'][1]]]
+    data['colors'] = plt.rcParams['axes.prop_cycle'].by_key()['color']
+    if plot.kind == 'bubble':
+        data['sizes'] = rounded(plot.df_den.loc[plot.years].to_numpy().T, 1)
+    return data
+
+
+def export(names=None, output='../images/player'):
+    """export
+
+     This function save the data of the plots for the player, player.js
+     and index.html which shows all exported plots
+
+     Args:
+         names (list): names of the plots (for example fig1), None for all plots
+         output (str): the folder for the files
+
+     Returns:
+         sizes (dict): the name of the plot -> the size of its .js file in bytes
+         """
+    df = load_data()
+    area = read_area(area_path)
+    os.makedirs(output, exist_ok=True)
+    shutil.copyfile(player_path, os.path.join(output, 'player.js'))
+    sizes = {}
+    for spec in specs:
+        if names and spec['name'] not in names:
+            continue
+        plot = Plot(spec, df, area)
+        try:
+            plot.prepare_data()
+            plot.init_plot()
+            data = plot_data(plot)
+        finally:
+            plt.close(plot.fig)
+        path = os.path.join(output, plot.name + '.js')
+        with open(path, 'w') as file:
+            file.write('drawPlot(%s, %s);\n' % (json.dumps(plot.name), json.dumps(data, separators=(',', ':'))))
+        sizes[plot.name] = os.path.getsize(path)
+    with open(os.path.join(output, 'index.html'), 'w') as file:
+        file.write('<!DOCTYPE html>\n<html>\n<head><title>Animated plots</title></head>\n<body>\n'
+                   '<script src="player.js"></script>\n')
+        for name in sizes:
+            file.write('<p><canvas id="%s" width="1200" height="800" style="width:100%%"></canvas></p>\n'
+                       '<script src="%s.js"></script>\n' % (name, name))
+        file.write('</body>\n</html>\n')
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the animated plots as data for the browser')
+    parser.add_argument('names', nargs='*', help='the plots (default: all)')
+    parser.add_argument('--output', default='../images/player', help='the folder for the files')
+    args = parser.parse_args()
+    sizes = export(args.names, args.output)
+    for name, size in sizes.items():
+        gif = '../images/%s.gif' % name
+        before = ' (gif %.0f kB)' % (os.path.getsize(gif) / 1000) if os.path.exists(gif) else ''
+        print('%s.js: %.1f kB%s' % (name, size / 1000, before))
+
+
+if __name__ == "__main__":
+    main()
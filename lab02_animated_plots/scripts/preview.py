@@ -0,0 +1,73 @@
+"""
+Data Analysis and Visualization, lab 2
+Patrycja Owczarek
+Script for a quick look at the animated plot while changing it:
+only every n-th frame is drawn, the figure has lower dpi and the mp4 file is encoded
+with the fastest x264 preset (without the gif), or the frames are put into one html file
+with the javascript player. The files are saved in images/preview, the scripts
+save their final files the same way as before.
+
+python preview.py fig1 --every 5 --dpi 40
+python preview.py fig11 --html
+"""
+
+import argparse
+import os
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.animation import FuncAnimation
+
+from engine import make_plot
+from writers import PipelinedWriter
+
+
+def preview(name, every=5, dpi=40, html=False, images='../images/preview'):
+    """preview
+
+     This function save the preview of the animated plot
+
+     Args:
+         name (str): the name of the plot (for example fig1)
+         every (int): only every n-th frame is drawn
+         dpi (int): the dpi of the figure (the scripts use 100)
+         html (bool): save the html file with the javascript player instead of mp4
+         images (str): the folder for the files
+
+     Returns:
+         path (str): path to the saved file
+         """
+    plot = make_plot(name)
+    plot.prepare_data()
+    plot.fig.set_dpi(dpi)
+    frames = range(0, len(plot.frame_years), every)
+    fps = max(1, round(plot.fps / every))
+    os.makedirs(images, exist_ok=True)
+    if html:
+        ani = FuncAnimation(plot.fig, plot.update_plot, init_func=plot.init_plot, frames=frames, blit=True)
+        path = os.path.join(images, name + '.html')
+        with open(path, 'w') as file:
+            file.write(ani.to_jshtml(fps=fps, default_mode='loop'))
+    else:
+        path = os.path.join(images, name + '.mp4')
+        plot.save(path, PipelinedWriter(None, fps=fps, preset='ultrafast'), frames)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Save the quick preview of the animated plot')
+    parser.add_argument('names', nargs='+', help='the plots, for example fig1')
+    parser.add_argument('--every', type=int, default=5, help='draw only every n-th frame')
+    parser.add_argument('--dpi', type=int, default=40, help='the dpi of the figure')
+    parser.add_argument('--html', action='store_true', help='save the html player instead of mp4')
+    parser.add_argument('--images', default='../images/preview', help='the folder for the files')
+    args = parser.parse_args()
+    for name in args.names:
+        start = time.perf_counter()
+        path = preview(name, args.every, args.dpi, args.html, args.images)
+        print('%s: %.1f s' % (path, time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    main()
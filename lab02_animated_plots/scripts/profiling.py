@@ -0,0 +1,315 @@
+"""
+Data Analysis and Visualization, lab 2
+Patrycja Owczarek
+Helper module (and script) for finding where the time of ani.save goes:
+the frame function and the grab_frame of the movie writer are wrapped and for every frame
+the time of the frame function, drawing the figure (and its texts), rasterizing to RGBA,
+writing to the encoder and the number of new memory blocks (sys.getallocatedblocks) are recorded.
+The summary shows the percentiles and the slowest frames, the trace can be opened
+in chrome://tracing or ui.perfetto.dev
+
+python profiling.py fig11 --trace ../benchmarks/fig11_trace.json
+"""
+
+import argparse
+import functools
+import json
+import os
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.animation import FuncAnimation
+from matplotlib.figure import Figure
+from matplotlib.text import Text
+import numpy as np
+
+from engine import make_plot
+from writers import Mp4GifWriter, LayeredWriter
+
+phases = ['callback', 'draw', 'text', 'rasterize', 'write', 'total']
+
+
+class TimedPipe:
+    """TimedPipe
+
+     The stdin of the encoder which measure how long the writing of the frame takes
+
+     Args:
+         pipe (file): the stdin of the encoder process
+         profiler (FrameProfiler): the profiler recording the time
+     """
+
+    def __init__(self, pipe, profiler):
+        self.pipe = pipe
+        self.profiler = profiler
+
+    def write(self, data):
+        with self.profiler.span('write'):
+            return self.pipe.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.pipe, name)
+
+
+class FrameProfiler:
+    """FrameProfiler
+
+     The opt-in instrumentation of ani.save. The frame function is wrapped with wrap,
+     the writer with wrap_writer and the saving is done inside with profiler: (then
+     Figure.draw and Text.draw are measured too)
+
+     Args:
+         None
+     """
+
+    def __init__(self):
+        self.frames = []
+        self.events = []
+        self.start = time.perf_counter_ns()
+        self.depth = {}
+        self.patched = []
+
+    def now(self):
+        return (time.perf_counter_ns() - self.start) / 1000
+
+    @property
+    def frame(self):
+        return self.frames[-1] if self.frames else None
+
+    def span(self, name, args=None):
+        """span
+
+         This function return the context manager which add the time of the block
+         to the current frame and the trace (nested calls of the same name count once)
+
+         Args:
+             name (str): the name of the phase
+             args (dict): the arguments shown in the trace or None
+
+         Returns:
+             (Span): the context manager
+             """
+        return Span(self, name, args)
+
+    def wrap(self, func):
+        """wrap
+
+         This function wrap the frame function (create_plot or update_plot),
+         every call starts the record of the new frame
+
+         Args:
+             func (function): the frame function
+
+         Returns:
+             (function): the wrapped frame function
+             """
+        @functools.wraps(func)
+        def callback(i, *args):
+            self.frames.append({'frame': i, 'start': self.now(), 'blocks': 0,
+                                **{phase: 0.0 for phase in phases}})
+            blocks = sys.getallocatedblocks()
+            with self.span('callback', {'frame': i}):
+                result = func(i, *args)
+            self.frame['blocks'] += sys.getallocatedblocks() - blocks
+            return result
+        return callback
+
+    def wrap_writer(self, writer):
+        """wrap_writer
+
+         This function wrap grab_frame of the movie writer: the frame is drawn and
+         written to the encoder through TimedPipe, the rest of savefig is the rasterizing
+
+         Args:
+             writer (MovieWriter): the writer passed to ani.save
+
+         Returns:
+             writer (MovieWriter): the same writer
+             """
+        grab_frame = writer.grab_frame
+
+        @functools.wraps(grab_frame)
+        def timed_grab_frame(**savefig_kwargs):
+            pipe = writer._proc.stdin
+            writer._proc.stdin = TimedPipe(pipe, self)
+            blocks = sys.getallocatedblocks()
+            draw, write = (self.frame['draw'], self.frame['write']) if self.frame else (0, 0)
+            try:
+                with self.span('grab_frame', {'frame': self.frame and self.frame['frame']}):
+                    start = self.now()
+                    grab_frame(**savefig_kwargs)
+                    duration = self.now() - start
+            finally:
+                writer._proc.stdin = pipe
+            if self.frame:
+                self.frame['blocks'] += sys.getallocatedblocks() - blocks
+                inner = (self.frame['draw'] - draw) + (self.frame['write'] - write)
+                self.frame['rasterize'] += duration - inner
+                self.frame['total'] = self.now() - self.frame['start']
+
+        writer.grab_frame = timed_grab_frame
+        return writer
+
+    def patch(self, cls, name, phase):
+        method = getattr(cls, name)
+        profiler = self
+
+        @functools.wraps(method)
+        def timed(artist, *args, **kwargs):
+            with profiler.span(phase):
+                return method(artist, *args, **kwargs)
+        setattr(cls, name, timed)
+        self.patched.append((cls, name, method))
+
+    def __enter__(self):
+        self.patch(Figure, 'draw', 'draw')
+        self.patch(Text, 'draw', 'text')
+        return self
+
+    def __exit__(self, *exc):
+        for cls, name, method in reversed(self.patched):
+            setattr(cls, name, method)
+        self.patched = []
+
+    def summary(self, slowest=5, bins=10):
+        """summary
+
+         This function describe the recorded frames: percentiles of every phase,
+         the histogram of the frame time and the slowest frames
+
+         Args:
+             slowest (int): the number of the slowest frames shown
+             bins (int): the number of bins of the histogram
+
+         Returns:
+             (str): the text of the summary
+             """
+        frames = [frame for frame in self.frames if frame['total']]
+        if not frames:
+            return 'no frames recorded'
+        lines = ['%d frames, %.2f s' % (len(frames), sum(frame['total'] for frame in frames) / 1e6),
+                 '%-10s%10s%10s%10s%10s%10s' % ('ms', 'mean', 'p50', 'p90', 'p99', 'max')]
+        for phase in phases:
+            times = np.array([frame[phase] for frame in frames]) / 1000
+            lines.append('%-10s%10.2f%10.2f%10.2f%10.2f%10.2f' % ((phase, times.mean())
+                                                                  + tuple(np.percentile(times, [50, 90, 99]))
+                                                                  + (times.max(),)))
+        blocks = np.array([frame['blocks'] for frame in frames])
+        lines.append('%-10s%10.0f%10.0f%10.0f%10.0f%10.0f' % (('blocks', blocks.mean())
+                                                              + tuple(np.percentile(blocks, [50, 90, 99]))
+                                                              + (blocks.max(),)))
+        totals = np.array([frame['total'] for frame in frames]) / 1000
+        counts, edges = np.histogram(totals, bins=bins)
+        lines.append('frame time histogram:')
+        for count, low, high in zip(counts, edges, edges[1:]):
+            lines.append('%8.1f - %8.1f ms %5d %s' % (low, high, count, '#' * int(50 * count / counts.max())))
+        lines.append('slowest frames:')
+        for frame in sorted(frames, key=lambda frame: -frame['total'])[:slowest]:
+            lines.append('frame %4s: ' % frame['frame']
+                         + ', '.join('%s %.1f ms' % (phase, frame[phase] / 1000) for phase in phases))
+        return '\n'.join(lines)
+
+    def save_trace(self, path):
+        """save_trace
+
+         This function save all recorded spans in the Chrome trace format (JSON)
+
+         Args:
+             path (str): path to the JSON file
+
+         Returns:
+             None
+             """
+        events = [{'name': 'frame %s' % frame['frame'], 'ph': 'X', 'ts': frame['start'],
+                   'dur': frame['total'], 'pid': 0, 'tid': 0, 'args': {k: v for k, v in frame.items()
+                                                                      if k != 'start'}}
+                  for frame in self.frames if frame['total']]
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': events + self.events, 'displayTimeUnit': 'ms'}, file)
+
+
+class Span:
+    """Span
+
+     The block of code measured by the profiler (see FrameProfiler.span)
+
+     Args:
+         profiler (FrameProfiler): the profiler
+         name (str): the name of the phase
+         args (dict): the arguments shown in the trace or None
+     """
+
+    def __init__(self, profiler, name, args=None):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        depth = self.profiler.depth
+        depth[self.name] = depth.get(self.name, 0) + 1
+        self.start = self.profiler.now()
+        return self
+
+    def __exit__(self, *exc):
+        profiler = self.profiler
+        duration = profiler.now() - self.start
+        profiler.depth[self.name] -= 1
+        if profiler.depth[self.name]:
+            return
+        event = {'name': self.name, 'ph': 'X', 'ts': self.start, 'dur': duration, 'pid': 0, 'tid': 0}
+        if self.args:
+            event['args'] = self.args
+        profiler.events.append(event)
+        if profiler.frame is not None and self.name in profiler.frame:
+            profiler.frame[self.name] += duration
+
+
+def profile_script(name, legacy=False, trace=None, layered=False):
+    """profile_script
+
+     This function save the animated plot (to the temporary folder)
+     with the instrumentation and print the summary
+
+     Args:
+         name (str): the name of the plot (for example fig11)
+         legacy (bool): measure create_plot instead of init_plot + update_plot
+         trace (str): path to the Chrome trace JSON file or None
+         layered (bool): save with LayeredWriter (the static part is rasterized once)
+
+     Returns:
+         profiler (FrameProfiler): the profiler with all frames
+         """
+    plot = make_plot(name)
+    plot.prepare_data()
+    profiler = FrameProfiler()
+    if legacy:
+        ani = FuncAnimation(plot.fig, profiler.wrap(plot.create_plot), frames=len(plot.years))
+    else:
+        ani = FuncAnimation(plot.fig, profiler.wrap(plot.update_plot), init_func=plot.init_plot,
+                            frames=len(plot.frame_years), blit=True)
+    with tempfile.TemporaryDirectory() as folder:
+        writer_class = LayeredWriter if layered else Mp4GifWriter
+        writer = profiler.wrap_writer(writer_class(os.path.join(folder, 'plot.gif')))
+        with profiler:
+            ani.save(os.path.join(folder, 'plot.mp4'), writer=writer)
+    print(profiler.summary())
+    if trace:
+        profiler.save_trace(trace)
+    return profiler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure every frame of ani.save')
+    parser.add_argument('name', help='the script, for example fig11')
+    parser.add_argument('--legacy', action='store_true', help='measure create_plot')
+    parser.add_argument('--trace', help='the Chrome trace JSON file')
+    parser.add_argument('--layered', action='store_true', help='rasterize the static part once')
+    args = parser.parse_args()
+    profile_script(args.name, args.legacy, args.trace, args.layered)
+
+
+if __name__ == "__main__":
+    main()
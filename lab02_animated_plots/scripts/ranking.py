@@ -0,0 +1,58 @@
+"""
+Data Analysis and Visualization, lab 2
+Patrycja Owczarek
+Helper module for the bar chart race plots:
+Sort all years of the cleaned dataframe at once and keep the rank of every
+country and the top countries for every year, so the frames only index the arrays
+"""
+
+import numpy as np
+
+
+def rank_matrix(df, years, k=5):
+    """rank_matrix
+
+     This function sort the population of all countries for all years with one argsort.
+     The rank 0 is the least populated country in the year.
+
+     Args:
+         df (dataframe): cleaned dataframe (countries as index, years as columns)
+         years (list): list of the years (columns) to rank
+         k (int): the number of top countries kept for every year
+
+     Returns:
+         ranks (ndarray): int16 matrix (countries x years) with the rank of every country
+         top (ndarray): matrix (years x k) with the row numbers of the top countries,
+                        sorted ascending like df.sort_values(by=year)[-k:]
+         """
+    values = df[years].to_numpy()
+    order = np.argsort(values, axis=0, kind='stable')
+    ranks = np.empty(order.shape, dtype=np.int16)
+    np.put_along_axis(ranks, order, np.arange(len(df.index), dtype=np.int16)[:, None], axis=0)
+    top = order[-k:, :].T
+    return ranks, top
+
+
+def neighbour_mask(df, years, anchors, window=2):
+    """neighbour_mask
+
+     This function find for every year the countries which are at most window places
+     from the anchor country in the ranking. The ranks are calculated once and the mask
+     for all anchors and years is made with numpy broadcasting.
+
+     Args:
+         df (dataframe): dataframe with the population (one row for every country)
+         years (list): list of the years (columns) to rank
+         anchors (int or list): row number(s) of the anchor country(ies)
+         window (int): how many places below and above the anchor are kept
+
+     Returns:
+         keep (ndarray): bool matrix (countries x years), or (anchors x countries x years)
+                         if the list of anchors is given
+         """
+    ranks, top = rank_matrix(df, years)
+    anchor_ranks = ranks[np.atleast_1d(anchors)][:, None, :]
+    keep = np.abs(ranks[None, :, :].astype(np.int32) - anchor_ranks) <= window
+    if np.ndim(anchors) == 0:
+        keep = keep[0]
+    return keep
@@ -0,0 +1,321 @@
+"""
+Data Analysis and Visualization, lab 2
+Patrycja Owczarek
+Helper module for the animated plots:
+Create the bars, bubbles and texts of the plot only once and in every frame
+change only their heights, positions and texts (the axes are not cleared)
+"""
+
+import time
+
+from matplotlib.axes import Axes
+import numpy as np
+
+
+def init_bars(ax, n=5, hidden=0, **kwargs):
+    """init_bars
+
+     This function create n empty bars placed at x = 0, 1, ..., n-1 and the hidden bars
+     which do not change the x axis (they are moved in the plot by update_bars)
+
+     Args:
+         ax (Axes): the axes of the plot
+         n (int): the number of bars
+         hidden (int): the number of the extra bars
+         **kwargs: arguments passed to ax.bar (color, edgecolor...)
+
+     Returns:
+         bars (list): list of the Rectangle artists
+         """
+    bars = list(ax.bar(range(n), [0] * n, **kwargs))
+    if hidden:
+        xlim = ax.get_xlim()
+        bars += list(ax.bar(range(hidden), [0] * hidden, **kwargs))
+        ax.set_xlim(xlim)
+    return bars
+
+
+def update_bars(bars, values, colors=None, hatches=None, places=None):
+    """update_bars
+
+     This function change the heights (and optionally colors, hatches and positions) of the bars
+
+     Args:
+         bars (list): list of the Rectangle artists from init_bars
+         values (list): the new heights of the bars
+         colors (list): the new colors of the bars or None
+         hatches (list): the new hatches of the bars or None
+         places (list): the new x positions of the centers of the bars or None
+
+     Returns:
+         None
+         """
+    for x, (bar, value) in enumerate(zip(bars, values)):
+        bar.set_height(value)
+        if colors is not None:
+            bar.set_facecolor(colors[x])
+        if hatches is not None:
+            bar.set_hatch(hatches[x])
+        if places is not None:
+            bar.set_x(places[x] - bar.get_width() / 2)
+
+
+def init_bubbles(ax, n=5, **kwargs):
+    """init_bubbles
+
+     This function create the scatter plot with n empty bubbles
+
+     Args:
+         ax (Axes): the axes of the plot
+         n (int): the number of bubbles
+         **kwargs: arguments passed to ax.scatter (alpha...)
+
+     Returns:
+         bubbles (PathCollection): the scatter artist
+         """
+    bubbles = ax.scatter(np.zeros(n), np.zeros(n), s=np.zeros(n), **kwargs)
+    return bubbles
+
+
+def update_bubbles(bubbles, x_axis, values, sizes):
+    """update_bubbles
+
+     This function move the bubbles and change its sizes
+
+     Args:
+         bubbles (PathCollection): the scatter artist from init_bubbles
+         x_axis (list): the new x positions
+         values (list): the new y positions
+         sizes (list): the new sizes of the bubbles
+
+     Returns:
+         None
+         """
+    bubbles.set_offsets(np.column_stack([x_axis, values]))
+    bubbles.set_sizes(np.asarray(sizes, dtype=float))
+
+
+def init_labels(ax, n=5, **kwargs):
+    """init_labels
+
+     This function create n empty texts, used for the names of the countries
+     and for the year
+
+     Args:
+         ax (Axes): the axes of the plot
+         n (int): the number of texts
+         **kwargs: arguments passed to ax.text (ha, weight, fontsize...)
+
+     Returns:
+         labels (list): list of the Text artists
+         """
+    labels = [ax.text(0, 0, '', **kwargs) for _ in range(n)]
+    return labels
+
+
+def update_labels(labels, x_pos, values, names):
+    """update_labels
+
+     This function move the texts and change what they say
+
+     Args:
+         labels (list): list of the Text artists from init_labels
+         x_pos (list): the new x positions
+         values (list): the new y positions
+         names (list): the new texts
+
+     Returns:
+         None
+         """
+    for label, x, value, name in zip(labels, x_pos, values, names):
+        label.set_position((x, value))
+        label.set_text(name)
+
+
+def init_lines(ax, n=5, *args, **kwargs):
+    """init_lines
+
+     This function create n empty lines (one for every country)
+
+     Args:
+         ax (Axes): the axes of the plot
+         n (int): the number of lines
+         *args: format of the line passed to ax.plot (for example 'o' for dots)
+         **kwargs: arguments passed to ax.plot (alpha...)
+
+     Returns:
+         lines (list): list of the Line2D artists
+         """
+    lines = [ax.plot([], [], *args, **kwargs)[0] for _ in range(n)]
+    return lines
+
+
+def grow_lines(lines, x_axis, values, i):
+    """grow_lines
+
+     This function add the point of the year i to every line. The lines get
+     the views of the arrays calculated once, so nothing is plotted again.
+
+     Args:
+         lines (list): list of the Line2D artists from init_lines
+         x_axis (ndarray): x positions of all years
+         values (ndarray): matrix (years x countries) with the values of all years
+         i (int): the number of the last year shown
+
+     Returns:
+         None
+         """
+    for k, line in enumerate(lines):
+        line.set_data(x_axis[:i + 1], values[:i + 1, k])
+
+
+def frame_timing(fig, func, frames, init_func=None):
+    """frame_timing
+
+     This function measure how long every frame takes: calling the frame function
+     and drawing the whole figure, the same as when the frame is saved to file
+
+     Args:
+         fig (Figure): the figure of the plot
+         func (function): the frame function (create_plot or update_plot)
+         frames (int): the number of frames
+         init_func (function): the function called once before the frames or None
+
+     Returns:
+         func_times (ndarray): the time of the frame function in every frame in seconds
+         draw_times (ndarray): the time of drawing the figure in every frame in seconds
+         """
+    if init_func is not None:
+        init_func()
+    func_times = np.empty(frames)
+    draw_times = np.empty(frames)
+    for i in range(frames):
+        start = time.perf_counter()
+        func(i)
+        middle = time.perf_counter()
+        fig.canvas.draw()
+        func_times[i] = middle - start
+        draw_times[i] = time.perf_counter() - middle
+    return func_times, draw_times
+
+
+def draw_order(fig):
+    """draw_order
+
+     This function list the artists of the figure in the order of fig.canvas.draw():
+     the children of the figure sorted by zorder, every Axes replaced by its patch
+     and its children sorted by zorder (the same as Axes.draw)
+
+     Args:
+         fig (Figure): the figure of the plot
+
+     Returns:
+         order (list): the artists in the order they are drawn
+         """
+    order = []
+    children = [artist for artist in fig.get_children() if artist is not fig.patch]
+    for artist in sorted(children, key=lambda artist: artist.get_zorder()):
+        if not isinstance(artist, Axes):
+            order.append(artist)
+            continue
+        ax = artist
+        artists = [child for child in ax.get_children() if child is not ax.patch]
+        if not (ax.axison and ax.get_frame_on()):
+            artists = [child for child in artists if child not in ax.spines.values()]
+        if not ax.axison:
+            artists = [child for child in artists if child not in (ax.xaxis, ax.yaxis)]
+        if ax.axison and ax.get_frame_on():
+            order.append(ax.patch)
+        order += sorted(artists, key=lambda artist: artist.get_zorder())
+    return order
+
+
+class StaticLayer:
+    """StaticLayer
+
+     The static part of the plot (axes, ticks, labels, title) rasterized only once.
+     In every frame only the animated artists (set_animated(True), FuncAnimation does it
+     for the artists from init_plot when blit=True) are drawn, the frame is the same
+     as fig.canvas.draw() would make. The static artists which are drawn after
+     the first animated one (zorder above it, for example the spines over the bars) are
+     kept in the foreground: they are drawn again only in the frames where an animated
+     artist touches them, in the same order as in fig.canvas.draw().
+     The static part must not change during the animation.
+
+     Args:
+         fig (Figure): the figure of the plot
+     """
+
+    def __init__(self, fig):
+        self.fig = fig
+        self.background = None
+
+    def cache(self):
+        """cache
+
+         This function draw the figure once without the animated artists and the foreground
+         (the part under the animated artists, the foreground is set animated for a moment,
+         so fig.canvas.draw() skips it but still places it), then draw the foreground on it
+         (the frame where nothing is animated), and find the pixels of every foreground artist
+
+         Args:
+             None
+
+         Returns:
+             None
+             """
+        self.artists = sorted(self.fig.findobj(lambda artist: artist.get_animated()),
+                              key=lambda artist: artist.get_zorder())
+        order = [artist for artist in draw_order(self.fig) if artist.get_visible()]
+        animated = [k for k, artist in enumerate(order) if artist.get_animated()]
+        first = animated[0] if animated else len(order)
+        self.order = order[first:]
+        self.foreground = [artist for artist in self.order if not artist.get_animated()]
+        for artist in self.foreground:
+            artist.set_animated(True)
+        canvas = self.fig.canvas
+        canvas.draw()
+        self.under = canvas.copy_from_bbox(self.fig.bbox)
+        renderer = canvas.get_renderer()
+        for artist in self.foreground:
+            artist.set_animated(False)
+            artist.draw(renderer)
+        self.background = np.asarray(canvas.buffer_rgba()).copy()
+        self.background_pixels = self.background.reshape(-1).view(np.uint32)
+        self.pixels = {}
+        for artist in self.foreground:
+            renderer.clear()
+            artist.draw(renderer)
+            self.pixels[artist] = np.flatnonzero(np.asarray(renderer.buffer_rgba())[:, :, 3])
+        self.frame = self.background.copy()
+
+    def draw(self):
+        """draw
+
+         This function draw the animated artists on the transparent layer to find their
+         pixels, then draw them again on the part under them with the foreground artists
+         they touch. Only the pixels of the animated artists are taken from this drawing,
+         the other ones are the same as in the background
+
+         Args:
+             None
+
+         Returns:
+             frame (ndarray): the RGBA frame (height x width x 4), valid until the next call
+             """
+        if self.background is None:
+            self.cache()
+        renderer = self.fig.canvas.get_renderer()
+        renderer.clear()
+        for artist in self.artists:
+            if artist.get_visible():
+                artist.draw(renderer)
+        covered = np.asarray(renderer.buffer_rgba())[:, :, 3].reshape(-1) != 0
+        touched = {artist for artist in self.foreground if covered[self.pixels[artist]].any()}
+        self.fig.canvas.restore_region(self.under)
+        for artist in self.order:
+            if artist.get_visible() and (artist.get_animated() or artist in touched):
+                artist.draw(renderer)
+        layer = np.asarray(renderer.buffer_rgba()).reshape(-1).view(np.uint32)
+        np.copyto(self.frame.reshape(-1).view(np.uint32), np.where(covered, layer, self.background_pixels))
+        return self.frame
@@ -0,0 +1,75 @@
+"""
+Data Analysis and Visualization, lab 2
+Patrycja Owczarek
+Script for saving the animated plot in several sizes from one render:
+the frames are drawn once at the biggest size (1080p) and one ffmpeg filter graph
+makes the 1080p and 720p mp4 files, the strip of thumbnails and the poster
+of the last frame. The files are saved in images/renditions.
+
+python renditions.py fig1 fig11 --height 1080 --videos 720 --thumbnails 10
+"""
+
+import argparse
+import math
+import os
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+
+from engine import make_plot
+from writers import RenditionWriter
+
+
+def renditions(name, height=1080, videos=(720,), thumbnails=10, thumbnail_width=192,
+               images='../images/renditions'):
+    """renditions
+
+     This function draw the frames of the plot once at the given height
+     and save all sizes of the animated plot from them
+
+     Args:
+         name (str): the name of the plot (for example fig1)
+         height (int): the height of the drawn frames in pixels (the dpi of the figure is changed)
+         videos (list): the heights of the smaller mp4 files
+         thumbnails (int): the number of thumbnails in the strip, 0 for no strip
+         thumbnail_width (int): the width of one thumbnail in pixels
+         images (str): the folder for the files
+
+     Returns:
+         paths (list): paths to the saved files
+         """
+    plot = make_plot(name)
+    plot.prepare_data()
+    plot.fig.set_dpi(height / plot.fig.get_figheight())
+    frames = len(plot.frame_years)
+    os.makedirs(images, exist_ok=True)
+    path = lambda suffix: os.path.join(images, '%s_%s' % (name, suffix))
+    sizes = {path('%dp.mp4' % video): video for video in videos}
+    strip = None
+    if thumbnails:
+        strip = (path('strip.png'), math.ceil(frames / thumbnails), thumbnails, thumbnail_width)
+    writer = RenditionWriter(sizes, strip, (path('poster.png'), frames - 1), fps=plot.fps)
+    plot.save(path('%dp.mp4' % height), writer)
+    return [path('%dp.mp4' % height)] + list(sizes) + ([strip[0]] if strip else []) + [path('poster.png')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Save the animated plot in several sizes from one render')
+    parser.add_argument('names', nargs='+', help='the plots, for example fig1')
+    parser.add_argument('--height', type=int, default=1080, help='the height of the drawn frames')
+    parser.add_argument('--videos', type=int, nargs='*', default=[720], help='the heights of the smaller mp4 files')
+    parser.add_argument('--thumbnails', type=int, default=10, help='the number of thumbnails in the strip')
+    parser.add_argument('--thumbnail-width', type=int, default=192, help='the width of one thumbnail')
+    parser.add_argument('--images', default='../images/renditions', help='the folder for the files')
+    args = parser.parse_args()
+    for name in args.names:
+        start = time.perf_counter()
+        paths = renditions(name, args.height, args.videos, args.thumbnails, args.thumbnail_width, args.images)
+        print('%s: %.1f s' % (name, time.perf_counter() - start))
+        for path in paths:
+            print('  %s %.0f kB' % (path, os.path.getsize(path) / 1000))
+
+
+if __name__ == "__main__":
+    main()
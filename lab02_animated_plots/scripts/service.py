@@ -0,0 +1,314 @@
+"""
+Data Analysis and Visualization, lab 2
+Patrycja Owczarek
+Script for making the "similar countries" animations on demand: a small local HTTP service.
+The population and the area are read once by every process of the pool and stay in memory,
+the finished mp4 and gif files are kept in the LRU cache (bounded by size), so the same
+request is answered from memory.
+
+python service.py --port 8000 --workers 2 --cache-mb 256
+curl -o bra.gif 'http://127.0.0.1:8000/render?kind=bubble&country=BRA&year=1990'
+curl 'http://127.0.0.1:8000/stats'
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+import batch
+from batch import init_worker, similar_spec
+from engine import Plot, load_data, select_countries
+from specs import specs
+
+kinds = {'bar': 'fig3', 'line': 'fig8', 'bubble': 'fig11', 'dot': 'fig14'}
+content_types = {'mp4': 'video/mp4', 'gif': 'image/gif'}
+
+
+class LRUCache:
+    """LRUCache
+
+     The cache of the finished animations: when the files take more than max_bytes,
+     the least recently used animations are removed. It is used by many threads at once
+
+     Args:
+         max_bytes (int): the maximum size of all files in the cache
+     """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """get
+
+         This function return the files of the animation and mark them as used
+
+         Args:
+             key (tuple): the parameters of the request
+
+         Returns:
+             (dict): format -> bytes of the file, None if not in the cache
+             """
+        with self.lock:
+            files = self.items.get(key)
+            if files is None:
+                self.misses += 1
+                return None
+            self.items.move_to_end(key)
+            self.hits += 1
+            return files
+
+    def put(self, key, files):
+        """put
+
+         This function add the files of the animation and remove the least recently
+         used ones until the cache fits in max_bytes (a file bigger than the cache is not kept)
+
+         Args:
+             key (tuple): the parameters of the request
+             files (dict): format -> bytes of the file
+
+         Returns:
+             None
+             """
+        size = sum(len(data) for data in files.values())
+        with self.lock:
+            if key in self.items:
+                self.size -= sum(len(data) for data in self.items.pop(key).values())
+            if size > self.max_bytes:
+                return
+            self.items[key] = files
+            self.size += size
+            while self.size > self.max_bytes:
+                _, old = self.items.popitem(last=False)
+                self.size -= sum(len(data) for data in old.values())
+
+    def stats(self):
+        with self.lock:
+            return {'animations': len(self.items), 'bytes': self.size, 'max_bytes': self.max_bytes,
+                    'hits': self.hits, 'misses': self.misses}
+
+
+def render_files(base, country, year, start, stop):
+    """render_files
+
+     This function make one animation in the process of the pool (with the data read
+     by batch.init_worker) and return the bytes of the mp4 and gif file
+
+     Args:
+         base (dict): the spec with the 'similar' rule
+         country (str): the country code
+         year (str): the anchor year
+         start (int): the first place (relative to the country)
+         stop (int): the place after the last one (relative to the country)
+
+     Returns:
+         (dict): format -> bytes of the file, None if there is no data to plot
+         """
+    spec = similar_spec(base, country, year, batch.names.get(country, country))
+    spec['select'].update({'start': start, 'stop': stop})
+    if select_countries(batch.df, spec['select']).empty:
+        return None
+    plot = Plot(spec, batch.df, batch.area)
+    try:
+        plot.prepare_data()
+        with tempfile.TemporaryDirectory() as images:
+            plot.save_plot(images)
+            files = {}
+            for fmt in content_types:
+                with open(os.path.join(images, '%s.%s' % (plot.name, fmt)), 'rb') as file:
+                    files[fmt] = file.read()
+    finally:
+        plt.close(plot.fig)
+    return files
+
+
+class RenderService:
+    """RenderService
+
+     The animations made on demand: the request parameters are checked, the same
+     request is answered from the cache and the same request which is being made
+     waits for it instead of making it again
+
+     Args:
+         workers (int): the number of processes, None for the number of cores
+         max_bytes (int): the maximum size of the cache
+     """
+
+    def __init__(self, workers=None, max_bytes=256 * 1024 ** 2):
+        df = load_data()
+        self.countries = set(df.index)
+        self.years = set(df.columns)
+        self.cache = LRUCache(max_bytes)
+        self.pool = ProcessPoolExecutor(workers, initializer=init_worker)
+        self.pending = {}
+        self.lock = threading.Lock()
+
+    def request_key(self, query):
+        """request_key
+
+         This function check the parameters of the request and make the key of the cache
+
+         Args:
+             query (dict): the parameters from the url (name -> list of values)
+
+         Returns:
+             (tuple): spec name, country, year, start and stop
+             """
+        value = lambda name, default=None: query.get(name, [default])[0]
+        kind = value('kind', 'bubble')
+        if kind not in kinds:
+            raise ValueError('kind must be one of %s' % ', '.join(kinds))
+        base = next(spec for spec in specs if spec['name'] == kinds[kind])
+        country = (value('country') or base['select']['country']).upper()
+        if country not in self.countries:
+            raise ValueError('unknown country: %s' % country)
+        year = value('year') or base['select']['year']
+        if year not in self.years:
+            raise ValueError('no data for the year: %s' % year)
+        start = int(value('start', base['select']['start']))
+        stop = int(value('stop', start + int(value('k', 5))))
+        if not 0 < stop - start <= 10:
+            raise ValueError('the plot shows from 1 to 10 countries')
+        return base['name'], country, year, start, stop
+
+    def render(self, key):
+        """render
+
+         This function return the files of the animation from the cache
+         or make them in the pool
+
+         Args:
+             key (tuple): the key from request_key
+
+         Returns:
+             files (dict): format -> bytes of the file, None if there is no data to plot
+             cached (bool): True if the files were in the cache
+             """
+        files = self.cache.get(key)
+        if files is not None:
+            return files, True
+        with self.lock:
+            future = self.pending.get(key)
+            if future is None:
+                base = next(spec for spec in specs if spec['name'] == key[0])
+                future = self.pool.submit(render_files, base, *key[1:])
+                self.pending[key] = future
+        try:
+            files = future.result()
+        finally:
+            with self.lock:
+                self.pending.pop(key, None)
+        if files is not None:
+            self.cache.put(key, files)
+        return files, False
+
+    def close(self):
+        self.pool.shutdown()
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Handler
+
+     The HTTP requests: GET /render?kind=&country=&year=&k=&start=&stop=&format=
+     (mp4 or gif) and GET /stats
+
+     Args:
+         the same as BaseHTTPRequestHandler
+     """
+
+    service = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/stats':
+            self.send(200, 'application/json', json.dumps(self.service.cache.stats()).encode())
+            return
+        if url.path != '/render':
+            self.send(404, 'text/plain', b'use /render or /stats')
+            return
+        query = parse_qs(url.query)
+        start = time.perf_counter()
+        try:
+            fmt = query.get('format', ['gif'])[0]
+            if fmt not in content_types:
+                raise ValueError('format must be mp4 or gif')
+            key = self.service.request_key(query)
+        except ValueError as error:
+            self.send(400, 'text/plain', str(error).encode())
+            return
+        try:
+            files, cached = self.service.render(key)
+        except Exception as error:
+            self.send(500, 'text/plain', ('%s: %s' % (type(error).__name__, error)).encode())
+            return
+        if files is None:
+            self.send(404, 'text/plain', b'no data to plot')
+            return
+        self.send(200, content_types[fmt], files[fmt],
+                  {'X-Cache': 'hit' if cached else 'miss',
+                   'X-Render-Time': '%.3f' % (time.perf_counter() - start)})
+
+    def send(self, code, content_type, body, headers=None):
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(host='127.0.0.1', port=8000, workers=None, cache_mb=256):
+    """serve
+
+     This function start the service and answer the requests until Ctrl+C
+
+     Args:
+         host (str): the address (only this computer by default)
+         port (int): the port
+         workers (int): the number of processes, None for the number of cores
+         cache_mb (int): the maximum size of the cache in MB
+
+     Returns:
+         None
+         """
+    Handler.service = RenderService(workers, cache_mb * 1024 ** 2)
+    server = ThreadingHTTPServer((host, port), Handler)
+    print('serving on http://%s:%d' % (host, port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        Handler.service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Make the similar countries animations on demand')
+    parser.add_argument('--host', default='127.0.0.1', help='the address')
+    parser.add_argument('--port', type=int, default=8000, help='the port')
+    parser.add_argument('--workers', type=int, help='the number of processes')
+    parser.add_argument('--cache-mb', type=int, default=256, help='the maximum size of the cache in MB')
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.cache_mb)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Data Analysis and Visualization, lab 2
+Patrycja Owczarek
+The specification of all animated plots (fig1 - fig15) for the engine:
+- kind: bar, line, dot or bubble
+- select: which countries are shown
+    race - all countries, the 5 most populated in every year are shown
+    largest - k most populated countries in the year
+    similar - countries from start to stop around the country, sorted by population in the year
+    neighbours - for every year the country and window bigger/smaller countries
+- scale: the population is divided by it
+- years: first and last (not included) year of the animation
+- style of the bars: colormap or hatches, for the codes (None for the order of the selected countries)
+- axes: ylabel, ylim (None to fit the data), title (text, size, weight), and xlim, xticks for lines and bubbles
+- steps: frames per year of the bar chart race (the bars slide between the years), 1 if missing
+- frames: the frame budget of the bar chart race, if given the steps are the most which fit in it
+- fps: frames per second of the output files
+"""
+
+hatches = ["|", "/", "+", "-", ".", "*", "x", "o"]
+
+hatches_long = ["|", "/", "+", "-", ".", "*",
+                "x", "o", "|-|", "//", "+.+", "-||-",
+                "...", "-\\ ", '\\/', ' \\ \\ ', 'o', ' //\\ ',
+                '+o', '*_', 'O', '_._', '|*', '.-.']
+
+most_populated = ["IDN", "RUS", "USA", "IND", "CHN", "JPN", "BRA", 'PAK']
+
+similar_japan = {'rule': 'similar', 'country': 'JPN', 'year': '1984', 'start': 0, 'stop': 5}
+
+similar_poland = {'rule': 'similar', 'country': 'POL', 'year': '1970', 'start': -2, 'stop': 3}
+
+neighbours_poland = {'rule': 'neighbours', 'country': 'POL', 'window': 2}
+
+largest = {'rule': 'largest', 'year': '1960', 'k': 5}
+
+year_ticks = (range(0, 60, 10), range(1960, 2020, 10))
+
+specs = [
+    {'name': 'fig1', 'kind': 'bar', 'select': {'rule': 'race'}, 'scale': 1000000, 'years': (1960, 2020),
+     'style': {'colors': 'Dark2', 'codes': most_populated},
+     'ylabel': 'Population [mln]', 'ylim': (0, 1500), 'title': ('The most populated countires', 40, 600),
+     'steps': 5, 'fps': 25},
+    {'name': 'fig2', 'kind': 'bar', 'select': {'rule': 'race'}, 'scale': 1000000, 'years': (1960, 2020),
+     'style': {'hatches': hatches, 'codes': most_populated},
+     'ylabel': 'Population [mln]', 'ylim': (0, 1500), 'title': ('The most populated countires', 40, 600),
+     'steps': 5, 'fps': 25},
+    {'name': 'fig3', 'kind': 'bar', 'select': similar_japan, 'scale': 1000000, 'years': (1960, 2019),
+     'style': {'colors': 'Dark2', 'codes': None},
+     'ylabel': 'Population [mln]', 'ylim': (0, 500),
+     'title': ('Countries most similar to population of Japan in 1984', 30, 0),
+     'fps': 5},
+    {'name': 'fig4', 'kind': 'bar', 'select': similar_japan, 'scale': 1000000, 'years': (1960, 2019),
+     'style': {'hatches': hatches, 'codes': None},
+     'ylabel': 'Population [mln]', 'ylim': (0, 500),
+     'title': ('Countries most similar to population of Japan in 1984', 30, 400),
+     'fps': 5},
+    {'name': 'fig5', 'kind': 'bar', 'select': neighbours_poland, 'scale': 100000, 'years': (1960, 2019),
+     'style': {'colors': 'tab20b', 'codes': None},
+     'ylabel': 'Population [100k]', 'ylim': (0, 500),
+     'title': ('Countries most similar to population of Poland', 30, 400),
+     'steps': 5, 'fps': 15},
+    {'name': 'fig6', 'kind': 'bar', 'select': neighbours_poland, 'scale': 100000, 'years': (1960, 2019),
+     'style': {'hatches': hatches_long, 'codes': None},
+     'ylabel': 'Population [100k]', 'ylim': (0, 500),
+     'title': ('Countries most similar to population of Poland', 30, 400),
+     'steps': 5, 'fps': 15},
+    {'name': 'fig7', 'kind': 'line', 'select': largest, 'scale': 1000000, 'years': (1960, 2020),
+     'ylabel': 'Population [mln]', 'ylim': (0, 1500), 'xlim': (-3, 60),
+     'title': ('The most populated countries', 40, 600),
+     'xticks': year_ticks,
+     'fps': 5},
+    {'name': 'fig8', 'kind': 'line', 'select': similar_japan, 'scale': 1000000, 'years': (1960, 2020),
+     'ylabel': 'Population [mln]', 'ylim': (0, 400), 'xlim': (-3, 60),
+     'title': ('Countries most similar to population of Japan in 1984', 30, 400),
+     'xticks': year_ticks,
+     'fps': 5},
+    {'name': 'fig9', 'kind': 'line', 'select': similar_poland, 'scale': 100000, 'years': (1960, 2020),
+     'ylabel': 'Population [100k]', 'ylim': (0, 650), 'xlim': (-3, 60),
+     'title': ('Countries most similar to population of Poland in 1970', 30, 400),
+     'xticks': year_ticks,
+     'fps': 5},
+    {'name': 'fig10', 'kind': 'bubble', 'select': largest, 'scale': 1000000, 'years': (1961, 2019),
+     'ylabel': 'Population', 'ylim': (0, 1500), 'xlim': (-3, 59),
+     'xticks': (range(0, 59, 10), range(1961, 2019, 10)),
+     'title': ('The most populated countries', 40, 600),
+     'fps': 5},
+    {'name': 'fig11', 'kind': 'bubble', 'select': similar_japan, 'scale': 1000000, 'years': (1961, 2019),
+     'ylabel': 'Population [mln]', 'ylim': (0, 400), 'xlim': (-3, 60),
+     'xticks': (range(0, 59, 10), range(1960, 2020, 10)),
+     'title': ('Countries most similar to population of Japan in 1984', 30, 400),
+     'fps': 5},
+    {'name': 'fig12', 'kind': 'bubble', 'select': similar_poland, 'scale': 100000, 'years': (1961, 2019),
+     'ylabel': 'Population [100k]', 'ylim': (0, 1100), 'xlim': (-3, 60),
+     'title': ('Countries most similar to population of Poland in 1970', 30, 400),
+     'xticks': year_ticks,
+     'fps': 5},
+    {'name': 'fig13', 'kind': 'dot', 'select': largest, 'scale': 1000000, 'years': (1960, 2020),
+     'ylabel': 'Population [mln]', 'ylim': (0, 1500), 'xlim': (0, 60),
+     'title': ('The most populated countries', 40, 600),
+     'xticks': year_ticks,
+     'fps': 5},
+    {'name': 'fig14', 'kind': 'dot', 'select': similar_japan, 'scale': 1000000, 'years': (1960, 2020),
+     'ylabel': 'Population [mln]', 'ylim': (0, 400), 'xlim': (0, 60),
+     'title': ('Countries most similar to population of Japan in 1984', 30, 400),
+     'xticks': year_ticks,
+     'fps': 5},
+    {'name': 'fig15', 'kind': 'dot', 'select': similar_poland, 'scale': 100000, 'years': (1960, 2020),
+     'ylabel': 'Population [100k]', 'ylim': (0, 1100), 'xlim': (0, 60),
+     'title': ('Countries most similar to population of Poland in 1970', 30, 400),
+     'xticks': year_ticks,
+     'fps': 5},
+]
@@ -0,0 +1,31 @@
+"""
+Data Analysis and Visualization, lab 2
+Patrycja Owczarek
+The tests import the modules of the scripts folder and read the data with the paths
+relative to it (../data), the same as the scripts
+"""
+
+import os
+import sys
+
+import matplotlib
+matplotlib.use('Agg')
+import pandas as pd
+import pytest
+
+scripts_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, scripts_dir)
+
+
+@pytest.fixture(autouse=True)
+def in_scripts_dir(monkeypatch):
+    monkeypatch.chdir(scripts_dir)
+
+
+@pytest.fixture(scope='session')
+def population():
+    """the population read the way the scripts did before (countries as index, years as columns)"""
+    df = pd.read_csv(os.path.join(scripts_dir, '../data/API_SP.POP.TOTL_DS2_en_csv_v2_2106202.csv'),
+                     skiprows=3)
+    df = df.set_index('Country Code')
+    return df[[x for x in df.columns if x.isdigit() and x != '2020']]
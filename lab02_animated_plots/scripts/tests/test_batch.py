@@ -0,0 +1,36 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+import pytest
+
+import batch
+from engine import Plot
+from specs import specs
+
+
+def test_render_one_removes_part_files(tmp_path, monkeypatch):
+    def failing_save(plot, images):
+        for ext in ('mp4', 'gif'):
+            open(os.path.join(images, '%s.%s' % (plot.name, ext)), 'w').close()
+        raise RuntimeError('ffmpeg failed')
+
+    monkeypatch.setattr(Plot, 'save_plot', failing_save)
+    batch.init_worker()
+    base = next(spec for spec in specs if spec['name'] == 'fig8')
+    with pytest.raises(RuntimeError):
+        batch.render_one(base, 'POL', '1984', str(tmp_path))
+    assert os.listdir(tmp_path) == []
+
+
+def test_batch_logs_failed_and_goes_on(tmp_path, monkeypatch):
+    def render_one(base, country, year, images):
+        if country == 'POL':
+            raise RuntimeError('ffmpeg failed')
+        return '%s_%s_%s' % (base['name'], country, year), 1.0
+
+    monkeypatch.setattr(batch, 'ProcessPoolExecutor', ThreadPoolExecutor)
+    monkeypatch.setattr(batch, 'render_one', render_one)
+    done = batch.batch('fig8', countries=['POL', 'CZE', 'HUN'], images=str(tmp_path), workers=1)
+    assert done == 2
+    status = batch.read_log(batch.log_path(str(tmp_path), 'fig8'))
+    assert status == {'fig8_POL_1984': 'failed', 'fig8_CZE_1984': 'done', 'fig8_HUN_1984': 'done'}
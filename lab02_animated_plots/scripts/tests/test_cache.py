@@ -0,0 +1,74 @@
+import os
+import shutil
+
+import pytest
+
+import world_bank
+from world_bank import cache_paths, read_world_bank
+
+population_path = '../data/API_SP.POP.TOTL_DS2_en_csv_v2_2106202.csv'
+
+
+@pytest.fixture
+def csv_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(world_bank, 'cache_dir', str(tmp_path / 'cache'))
+    path = str(tmp_path / 'population.csv')
+    shutil.copyfile(population_path, path)
+    return path
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    calls = []
+    build_cache = world_bank.build_cache
+
+    def counting_build(df_path, stat):
+        calls.append(df_path)
+        return build_cache(df_path, stat)
+
+    monkeypatch.setattr(world_bank, 'build_cache', counting_build)
+    return calls
+
+
+def poland_1960(df):
+    return df.loc[df['Country Code'] == 'POL', '1960'].iloc[0]
+
+
+def change_poland(path, old, new):
+    with open(path, encoding='utf-8') as file:
+        text = file.read()
+    assert text.count(old) == 1
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        file.write(text.replace(old, new))
+
+
+def test_cache_is_read_while_the_file_is_the_same(csv_path, builds):
+    read_world_bank(csv_path)
+    df = read_world_bank(csv_path)
+    assert len(builds) == 1
+    assert all(os.path.exists(path) for path in cache_paths(csv_path))
+    assert poland_1960(df) == 29637450
+
+
+def test_new_mtime_checks_the_hash(csv_path, builds):
+    read_world_bank(csv_path)
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    read_world_bank(csv_path)
+    assert len(builds) == 1
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10 ** 9))
+    read_world_bank(csv_path)
+    assert len(builds) == 1
+
+
+def test_cache_is_made_again_when_the_data_changes(csv_path, builds):
+    read_world_bank(csv_path)
+    stat = os.stat(csv_path)
+    change_poland(csv_path, '"29637450"', '"29637451"')
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert os.stat(csv_path).st_size == stat.st_size
+    assert poland_1960(read_world_bank(csv_path)) == 29637451
+    change_poland(csv_path, '"29637451"', '"2963745"')
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert poland_1960(read_world_bank(csv_path)) == 2963745
+    assert len(builds) == 3
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+from density import density_matrix
+
+area_path = '../data/API_AG.LND.TOTL.K2_DS2_en_csv_v2_2164047.csv'
+
+
+def calculate_density(df_year, year):
+    """calculate_density of fig10 - fig12 before density_matrix"""
+    density = pd.read_csv(area_path, sep=',', skiprows=3)
+    df_den = []
+    for col in list(df_year.columns):
+        cell = density.loc[density["Country Code"] == col, year].iloc[0]
+        cell = (df_year[col].iloc[-1] * 1000000) / cell
+        df_den.append(cell)
+    return df_den
+
+
+def test_density_matrix_matches_calculate_density(population):
+    df = population.loc[['JPN', 'MEX', 'POL', 'NLD', 'MCO', 'CHN']].T.div(1000000)
+    df_den = density_matrix(df, area_path)
+    assert df_den.shape == df.shape
+    # the scripts passed df.iloc[:i + 2] and took the population of the next year,
+    # the density of the year uses the population of the same year
+    for i, year in enumerate(df.index):
+        np.testing.assert_allclose(df_den.loc[year], calculate_density(df.iloc[:i + 1], year), rtol=1e-12)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from nearest import PopulationIndex
+
+
+@pytest.fixture(scope='module')
+def indexed(population):
+    return population, PopulationIndex(population)
+
+
+def closest(df, year, value, k):
+    return np.sort((df[year] - value).abs().nsmallest(k).to_numpy())
+
+
+def test_nearest_value(indexed):
+    df, index = indexed
+    for year in ['1960', '1984', '2019']:
+        for value in [0, 1e5, 38e6, 127e6, 2e9]:
+            rows = index.nearest_value(value, year, 5)
+            np.testing.assert_array_equal(np.sort(np.abs(df[year].to_numpy()[rows] - value)),
+                                          closest(df, year, value, 5))
+
+
+def test_nearest(indexed):
+    df, index = indexed
+    for year in ['1970', '1984']:
+        for country in ['POL', 'JPN', 'CHN', 'TUV']:
+            rows = index.nearest(country, year, 5)
+            value = df.loc[country, year]
+            assert df.index[rows[0]] == country
+            np.testing.assert_array_equal(np.sort(np.abs(df[year].to_numpy()[rows] - value)),
+                                          closest(df, year, value, 5))
+
+
+def test_nearest_all(indexed):
+    df, index = indexed
+    rows = index.nearest_all(5)
+    values = df.to_numpy()
+    for year in index.years[::10]:
+        col = index.columns[year]
+        for row in range(len(df.index)):
+            value = values[row, col]
+            if np.isnan(value):
+                assert np.all(rows[row, col] == -1)
+                continue
+            np.testing.assert_array_equal(np.sort(np.abs(values[rows[row, col], col] - value)),
+                                          closest(df, year, value, 5))
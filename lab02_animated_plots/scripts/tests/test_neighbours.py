@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from countries import drop_aggregates
+from ranking import neighbour_mask
+
+
+def get_countries(df, country):
+    """get_countries of fig5 and fig6 before neighbour_mask (one sort for every year)"""
+    for col in df.columns[2:]:
+        df = df.sort_values(by=col, ignore_index=True)
+        ind = df.index[df['Country Code'] == country].tolist()
+        start = ind[0]-3
+        end = ind[0]+3
+        df.loc[:start, col] = 0
+        df.loc[end:, col] = 0
+    return df
+
+
+@pytest.fixture(scope='module')
+def countries():
+    df = pd.read_csv('../data/API_SP.POP.TOTL_DS2_en_csv_v2_2106202.csv', sep=',', skiprows=3)
+    df = drop_aggregates(df)
+    return df.drop(columns=['Indicator Code', 'Indicator Name', '2020', 'Unnamed: 65'])
+
+
+@pytest.mark.parametrize('country', ['POL', 'JPN', 'NLD', 'MCO'])
+def test_neighbour_mask_matches_get_countries(countries, country):
+    years = list(countries.columns[2:])
+    old = get_countries(countries.copy(), country).set_index('Country Code')[years]
+    keep = neighbour_mask(countries, years, np.flatnonzero(countries['Country Code'] == country)[0])
+    for k, year in enumerate(years):
+        assert set(old.index[old[year] != 0]) == set(countries['Country Code'][keep[:, k]])
+
+
+def test_neighbour_mask_of_many_anchors(countries):
+    years = list(countries.columns[2:])
+    anchors = [0, 10, 20]
+    keep = neighbour_mask(countries, years, anchors)
+    assert keep.shape == (len(anchors), len(countries.index), len(years))
+    for i, anchor in enumerate(anchors):
+        np.testing.assert_array_equal(keep[i], neighbour_mask(countries, years, anchor))
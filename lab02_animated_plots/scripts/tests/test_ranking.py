@@ -0,0 +1,14 @@
+import numpy as np
+
+from ranking import rank_matrix
+
+
+def test_rank_matrix_matches_sort_values(population):
+    # the aggregates have equal values in some years, the stable sort orders them like argsort
+    df = population.dropna()
+    years = list(df.columns)
+    ranks, top = rank_matrix(df, years)
+    for k, year in enumerate(years):
+        ordered = df.sort_values(by=year, kind='stable').index
+        np.testing.assert_array_equal(df.index[np.argsort(ranks[:, k])], ordered)
+        np.testing.assert_array_equal(df.index[top[k]], ordered[-5:])
@@ -0,0 +1,58 @@
+import os
+import shutil
+
+from matplotlib.figure import Figure
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from engine import make_plot
+from renderer import StaticLayer
+from writers import LayeredWriter
+
+
+def full_draw(plot, artists):
+    for artist in artists:
+        artist.set_animated(False)
+    plot.fig.canvas.draw()
+    frame = np.asarray(plot.fig.canvas.buffer_rgba()).copy()
+    for artist in artists:
+        artist.set_animated(True)
+    return frame
+
+
+@pytest.mark.parametrize('name', ['fig1', 'fig6', 'fig11', 'fig13'])
+def test_layer_equals_full_draw(name):
+    plot = make_plot(name)
+    plot.prepare_data()
+    artists = plot.init_plot()
+    for artist in artists:
+        artist.set_animated(True)
+    layer = StaticLayer(plot.fig)
+    try:
+        for i in range(0, len(plot.frame_years), 11):
+            plot.update_plot(i)
+            frame = layer.draw().copy()
+            np.testing.assert_array_equal(frame, full_draw(plot, artists), err_msg='frame %d' % i)
+    finally:
+        plt.close(plot.fig)
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason='ffmpeg is not installed')
+def test_save_draws_figure_once(tmp_path, monkeypatch):
+    plot = make_plot('fig13')
+    plot.prepare_data()
+    draws = []
+    draw = Figure.draw
+    monkeypatch.setattr(Figure, 'draw', lambda fig, renderer: draws.append(fig) or draw(fig, renderer))
+    frames = range(0, len(plot.frame_years), 10)
+    writer = LayeredWriter(str(tmp_path / 'fig13.gif'), fps=plot.fps)
+    grabbed = []
+    grab_frame = writer.grab_frame
+    monkeypatch.setattr(writer, 'grab_frame', lambda: grabbed.append(len(draws)) or grab_frame())
+    try:
+        plot.save(str(tmp_path / 'fig13.mp4'), writer, frames)
+    finally:
+        plt.close(plot.fig)
+    assert grabbed[0] == 0 and len(draws) == 1
+    assert os.path.getsize(tmp_path / 'fig13.mp4') > 0 and os.path.getsize(tmp_path / 'fig13.gif') > 0
@@ -0,0 +1,65 @@
+import threading
+from http.server import ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from service import Handler, LRUCache, RenderService
+
+
+def test_lru_cache_removes_least_recently_used():
+    cache = LRUCache(10)
+    cache.put('a', {'gif': b'aaaa'})
+    cache.put('b', {'gif': b'bb', 'mp4': b'bb'})
+    assert cache.get('a') is not None
+    cache.put('c', {'gif': b'cccc'})
+    assert cache.get('b') is None
+    assert cache.get('a') == {'gif': b'aaaa'} and cache.get('c') == {'gif': b'cccc'}
+    assert cache.stats() == {'animations': 2, 'bytes': 8, 'max_bytes': 10, 'hits': 3, 'misses': 1}
+
+
+def test_lru_cache_skips_too_big_files():
+    cache = LRUCache(10)
+    cache.put('a', {'gif': b'aaaa'})
+    cache.put('a', {'gif': b'a' * 11})
+    assert cache.get('a') is None
+    assert cache.stats()['bytes'] == 0
+
+
+@pytest.fixture(scope='module')
+def server():
+    Handler.service = RenderService(workers=1)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield 'http://127.0.0.1:%d' % server.server_address[1]
+    server.shutdown()
+    thread.join()
+    server.server_close()
+    Handler.service.close()
+
+
+@pytest.mark.parametrize('query, message', [
+    ('kind=pie', 'kind must be one of'),
+    ('country=XYZ', 'unknown country: XYZ'),
+    ('year=1900', 'no data for the year: 1900'),
+    ('k=0', 'the plot shows from 1 to 10 countries'),
+    ('start=0&stop=11', 'the plot shows from 1 to 10 countries'),
+    ('k=five', 'invalid literal'),
+    ('format=webm', 'format must be mp4 or gif'),
+])
+def test_bad_request(server, query, message):
+    with pytest.raises(HTTPError) as error:
+        urlopen('%s/render?%s' % (server, query))
+    assert error.value.code == 400
+    assert message in error.value.read().decode()
+    assert Handler.service.pending == {}
+
+
+def test_stats_and_unknown_path(server):
+    with urlopen(server + '/stats') as response:
+        assert response.headers['Content-Type'] == 'application/json'
+    with pytest.raises(HTTPError) as error:
+        urlopen(server + '/index.html')
+    assert error.value.code == 404
@@ -0,0 +1,77 @@
+import shutil
+import subprocess
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from PIL import Image
+import pytest
+
+from engine import Plot, find_spec, load_data, neighbour_countries
+from specs import neighbours_poland
+from tween import frame_count, tween_bars
+from writers import ffmpeg_args
+
+
+def bar_track(codes, values, places, code):
+    rows = np.flatnonzero((codes == code).any(axis=1))
+    cols = np.argmax(codes[rows] == code, axis=1)
+    return rows, values[rows, cols], places[rows, cols]
+
+
+def test_exiting_bar_keeps_real_values():
+    df = pd.DataFrame({'2000': [1.0, 2.0, 3.0, 4.0], '2001': [1.0, 2.0, 3.0, 6.0]},
+                      index=['A', 'B', 'C', 'D'])
+    keep = pd.DataFrame({'2000': [False, True, True, True], '2001': [True, True, True, False]},
+                        index=df.index)
+    codes, values, places, frame_years = tween_bars(df, ['2000', '2001'], k=3, steps=4, keep=keep)
+    rows, track, x = bar_track(codes, values, places, 'D')
+    assert np.all((track >= 4) & (track <= 6))
+    assert x[0] == 2 and np.all(np.diff(x) > 0) and np.all(x < 4)
+    rows, track, x = bar_track(codes, values, places, 'A')
+    assert np.all(track == 1)
+    assert x[0] == -2 and x[-1] == 0
+
+
+def test_neighbours_exit_on_their_side():
+    df, keep = neighbour_countries(load_data(), neighbours_poland)
+    years = [str(x) for x in range(1960, 2019)]
+    codes, values, places, frame_years = tween_bars(df, years, steps=5, keep=keep)
+    real = df[years].to_numpy()
+    for code in df.index:
+        rows, track, x = bar_track(codes, values, places, code)
+        row = df.index.get_loc(code)
+        for start in range(len(years) - 1):
+            inside = (rows >= 5 * start) & (rows <= 5 * (start + 1))
+            low, high = sorted(real[row, start:start + 2])
+            assert np.all((track[inside] >= low - 1e-6) & (track[inside] <= high + 1e-6))
+            assert np.all(np.diff(x[inside]) >= 0) or np.all(np.diff(x[inside]) <= 0)
+
+
+def test_frame_budget_of_the_spec():
+    plot = Plot(dict(find_spec('fig1'), frames=150), load_data())
+    plot.prepare_data()
+    plt.close(plot.fig)
+    assert plot.steps == 2
+    assert len(plot.frame_years) == frame_count(len(plot.years), plot.steps) == 119
+    assert list(plot.frame_years[::plot.steps]) == plot.years
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason='ffmpeg is not installed')
+def test_gif_keeps_the_year_frames(tmp_path):
+    frames = np.zeros((23, 16, 48, 4), np.uint8)
+    frames[..., 3] = 255
+    for i in range(len(frames)):
+        frames[i, :, 8 + i] = 255
+    gif = str(tmp_path / 'race.gif')
+    subprocess.run(ffmpeg_args(str(tmp_path / 'race.mp4'), (48, 16), fps=25, gif=gif, gif_step=5),
+                   input=frames.tobytes(), check=True)
+    image = Image.open(gif)
+    shown = []
+    durations = []
+    for i in range(image.n_frames):
+        image.seek(i)
+        shown.append(int(np.asarray(image.convert('RGB'))[0, :, 0].argmax()))
+        durations.append(image.info['duration'])
+    assert shown == [8, 13, 18, 23, 28]
+    assert durations == [200] * 5
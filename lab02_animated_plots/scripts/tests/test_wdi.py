@@ -0,0 +1,39 @@
+import csv
+
+import numpy as np
+
+import world_bank
+from engine import population_path
+
+
+def write_wdi(path, codes):
+    with open(population_path, encoding='utf-8-sig') as f:
+        rows = list(csv.reader(f.readlines()[4:]))
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+        writer.writerow(rows[0])
+        for k, code in enumerate(codes):
+            for row in rows[1:]:
+                writer.writerow(row[:2] + ['Indicator %s' % code, code] + [x and str(float(x) * (k + 1)) for x in row[4:]])
+
+
+def test_cube_reused_for_subset(tmp_path, monkeypatch):
+    monkeypatch.setattr(world_bank, 'cache_dir', str(tmp_path))
+    wdi_path = str(tmp_path / 'WDIData.csv')
+    write_wdi(wdi_path, ['A', 'B', 'C'])
+    builds = []
+    build = world_bank.build_wdi_cube
+    monkeypatch.setattr(world_bank, 'build_wdi_cube', lambda *args: builds.append(args[2]) or build(*args))
+    meta, cube = world_bank.read_wdi(wdi_path, ['A', 'B'])
+    assert meta['indicators'] == ['A', 'B']
+    world_bank.read_wdi(wdi_path, ['B'])
+    world_bank.read_indicator(wdi_path, 'A')
+    world_bank.read_matrix(wdi_path, indicator='B')
+    assert len(builds) == 1
+    meta, cube = world_bank.read_wdi(wdi_path, ['C'])
+    assert meta['indicators'] == ['A', 'B', 'C'] and len(builds) == 2
+    a = cube[meta['indicators'].index('A')]
+    np.testing.assert_allclose(cube[meta['indicators'].index('C')], 3 * a, rtol=1e-6)
+    world_bank.read_wdi(wdi_path)
+    world_bank.read_wdi(wdi_path, ['A'])
+    assert builds[2] is None and len(builds) == 3
@@ -0,0 +1,11 @@
+import numpy as np
+
+from engine import population_path
+from world_bank import read_matrix, read_world_bank
+
+
+def test_read_matrix_drops_middle_year():
+    codes, years, values = read_matrix(population_path, drop_years=['1990', '2020'], chunk=50)
+    assert '1990' not in years and years[0] == '1960' and years[-1] == '2019'
+    df = read_world_bank(population_path).set_index('Country Code')
+    np.testing.assert_array_equal(values, df.loc[codes, years].to_numpy())
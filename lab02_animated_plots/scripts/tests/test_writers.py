@@ -0,0 +1,80 @@
+import shutil
+
+import matplotlib.pyplot as plt
+import numpy as np
+from PIL import Image
+import pytest
+
+from engine import make_plot
+from writers import PipelinedWriter, global_palette, quantize_frame
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason='ffmpeg is not installed')
+def test_pipelined_writer_stops_after_error(tmp_path, monkeypatch):
+    plot = make_plot('fig11')
+    plot.prepare_data()
+    update_plot = plot.update_plot
+
+    def failing_update(i):
+        if i == 3:
+            raise RuntimeError('frame %d' % i)
+        return update_plot(i)
+
+    monkeypatch.setattr(plot, 'update_plot', failing_update)
+    writer = PipelinedWriter(str(tmp_path / 'fig11.gif'), fps=plot.fps)
+    try:
+        with pytest.raises(RuntimeError, match='frame 3'):
+            plot.save(str(tmp_path / 'fig11.mp4'), writer)
+    finally:
+        plt.close(plot.fig)
+    assert not writer.thread.is_alive()
+    assert writer._proc.poll() is not None
+    assert writer.free.qsize() == writer.slots
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason='ffmpeg is not installed')
+def test_pipelined_writer_stops_when_ffmpeg_dies(tmp_path, monkeypatch):
+    plot = make_plot('fig11')
+    plot.prepare_data()
+    writer = PipelinedWriter(None, fps=plot.fps)
+    update_plot = plot.update_plot
+
+    def killing_update(i):
+        if i == 2:
+            writer._proc.kill()
+            writer._proc.wait()
+        return update_plot(i)
+
+    monkeypatch.setattr(plot, 'update_plot', killing_update)
+    try:
+        with pytest.raises(Exception):
+            plot.save(str(tmp_path / 'fig11.mp4'), writer)
+    finally:
+        plt.close(plot.fig)
+    assert not writer.thread.is_alive()
+    assert writer._proc.poll() is not None
+
+
+def test_global_palette_keeps_colors():
+    frames = np.zeros((3, 20, 30, 4), dtype=np.uint8)
+    frames[:, :, :, :3] = 255
+    frames[0, :5, :5, :3] = (27, 158, 119)
+    frames[1, 5:10, :5, :3] = (217, 95, 2)
+    frames[2, :5, :5, :3] = (27, 158, 119)
+    palette = global_palette(frames)
+    images = [quantize_frame(frame, palette) for frame in frames]
+    for frame, image in zip(frames, images):
+        np.testing.assert_array_equal(np.asarray(image.convert('RGB')), frame[:, :, :3])
+    assert np.asarray(images[0])[0, 0] == np.asarray(images[2])[0, 0]
+    assert np.asarray(images[0])[19, 29] == np.asarray(images[1])[19, 29]
+
+
+def test_save_plot_with_encoder(tmp_path):
+    plot = make_plot('fig11')
+    plot.prepare_data()
+    try:
+        plot.save_plot(str(tmp_path), encoder='pillow-gif')
+    finally:
+        plt.close(plot.fig)
+    with Image.open(tmp_path / 'fig11.gif') as image:
+        assert image.n_frames == len(plot.frame_years)
@@ -0,0 +1,154 @@
+"""
+Data Analysis and Visualization, lab 2
+Patrycja Owczarek
+Helper module for the smooth bar chart race plots:
+Make steps frames between every two years at once with numpy. Both the population
+and the place of the country in the ranking are interpolated, so the bars slide
+when two countries swap places and new countries come in from the side they enter by
+"""
+
+import numpy as np
+
+from ranking import rank_matrix
+
+
+def steps_for_budget(n_years, frames):
+    """steps_for_budget
+
+     This function find how many frames per year fit in the frame budget
+
+     Args:
+         n_years (int): the number of years
+         frames (int): the maximum number of frames of the animation
+
+     Returns:
+         steps (int): the number of frames per year (at least 1)
+         """
+    return max(1, (frames - 1) // max(n_years - 1, 1))
+
+
+def frame_count(n_years, steps):
+    """frame_count
+
+     This function return the number of frames of the animation with steps frames per year
+
+     Args:
+         n_years (int): the number of years
+         steps (int): the number of frames per year
+
+     Returns:
+         (int): the number of frames
+         """
+    return (n_years - 1) * steps + 1
+
+
+def ease(t):
+    """ease
+
+     This function slow down the start and the end of the move (smoothstep)
+
+     Args:
+         t (ndarray): the fractions of the year from 0 to 1
+
+     Returns:
+         (ndarray): the eased fractions
+         """
+    return t * t * (3 - 2 * t)
+
+
+def interpolate(matrix, t):
+    """interpolate
+
+     This function make the frames between every two neighbouring columns of the matrix
+
+     Args:
+         matrix (ndarray): matrix (countries x years)
+         t (ndarray): the fractions of the year for the frames of one year
+
+     Returns:
+         (ndarray): matrix (countries x frames), the last column is the last year
+         """
+    start = matrix[:, :-1, None]
+    frames = start + (matrix[:, 1:, None] - start) * t
+    frames = frames.reshape(len(matrix), -1)
+    return np.concatenate([frames, matrix[:, -1:]], axis=1)
+
+
+def bar_places(df, years, k=5, hidden=-2, keep=None):
+    """bar_places
+
+     This function find the place of every country in every year: 0 to k-1 for the k shown
+     countries (0 is the least populated), hidden for the countries below them and k-1-hidden
+     for the countries above them, so the bar leaves and comes in on its real side
+
+     Args:
+         df (dataframe): cleaned dataframe with the real population (countries as index, years as columns)
+         years (list): list of the years (columns)
+         k (int): the number of countries shown in the year
+         hidden (float): the place of the countries below the shown ones
+         keep (dataframe): bool dataframe like df with the k shown countries of every year
+                           (neighbouring in the ranking), None for the top k
+
+     Returns:
+         places (ndarray): matrix (countries x years) with the places
+         shown (ndarray): bool matrix (countries x years), True if the country is shown
+         """
+    ranks, top = rank_matrix(df, years, k)
+    if keep is None:
+        shown = ranks >= len(df.index) - k
+    else:
+        shown = keep[years].to_numpy(dtype=bool)
+    lowest = np.where(shown, ranks, len(df.index)).min(axis=0)
+    places = ranks.astype(float) - lowest
+    places[~shown & (places < 0)] = hidden
+    places[~shown & (places >= 0)] = k - 1 - hidden
+    return places, shown
+
+
+def tween_bars(df, years, k=5, steps=10, frames=None, hidden=-2, keep=None):
+    """tween_bars
+
+     This function precompute all frames of the bar chart race with steps frames per year.
+     The place 0 is the least populated of the k shown countries, place k-1 the most
+     populated one, the countries which are not shown are out of the plot on their real
+     side (see bar_places) and keep their real population while they leave or come in.
+     Every frame shows the countries which are shown in one of the two years,
+     so at most 2k bars (the unused bars are hidden).
+
+     Args:
+         df (dataframe): cleaned dataframe with the real population (countries as index, years as columns)
+         years (list): list of the years (columns)
+         k (int): the number of countries shown in the year
+         steps (int): the number of frames per year (1 for no tweening)
+         frames (int): the frame budget, if given steps is calculated from it
+         hidden (float): the place of the countries below the shown ones
+         keep (dataframe): bool dataframe like df with the k shown countries of every year
+                           (neighbouring in the ranking), None for the top k
+
+     Returns:
+         codes (ndarray): matrix (frames x 2k) with the country codes of the bars ('' if not shown)
+         values (ndarray): matrix (frames x 2k) with the population
+         places (ndarray): matrix (frames x 2k) with the x position of the bars
+         frame_years (list): the year shown in every frame
+         """
+    if frames is not None:
+        steps = steps_for_budget(len(years), frames)
+    values = df[years].to_numpy(dtype=float)
+    places, shown = bar_places(df, years, k, hidden, keep)
+    t = np.arange(steps) / steps
+    values = interpolate(values, t)
+    places = interpolate(places, ease(t))
+    shown = np.concatenate([np.repeat(shown[:, :-1] | shown[:, 1:], steps, axis=1), shown[:, -1:]], axis=1)
+    order = np.argsort(~shown, axis=0, kind='stable')[:2 * k]
+    cols = np.arange(shown.shape[1])
+    in_frame = shown[order, cols].T
+    codes = np.where(in_frame, df.index.to_numpy()[order.T], '')
+    values = np.where(in_frame, values[order, cols].T, 0)
+    places = np.where(in_frame, places[order, cols].T, hidden)
+    missing = 2 * k - codes.shape[1]
+    if missing > 0:
+        codes = np.pad(codes, ((0, 0), (0, missing)), constant_values='')
+        values = np.pad(values, ((0, 0), (0, missing)))
+        places = np.pad(places, ((0, 0), (0, missing)), constant_values=hidden)
+    frame_years = [year for year in years[:-1] for _ in range(steps)] + [years[-1]]
+    return codes, values, places, frame_years
@@ -0,0 +1,403 @@
+"""
+Data Analysis and Visualization, lab 2
+Patrycja Owczarek
+Helper module for reading the data from The Word Bank:
+The .csv file is parsed only the first time. The values are saved in data/cache
+as the .npy matrix (countries x years) with the .json file containing country codes,
+names and years, the next time the matrix is only memory mapped.
+The cache is made again when the .csv file changes (checked by mtime and hash).
+read_matrix copy the countries and years straight from the memory mapped matrix
+to one float block (no object columns), matrix_frame wraps it without a copy.
+The bulk .csv of all World Development Indicators is streamed in chunks to the float32
+cube (indicators x countries x years) in data/cache, so any indicator is read from
+the memory mapped cube without loading the whole file
+"""
+
+import csv
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from countries import cache_dir, country_mask
+
+
+def file_hash(df_path):
+    """file_hash
+
+     This function calculate sha1 hash of the file
+
+     Args:
+         df_path (str): string contains path to the file
+
+     Returns:
+         (str): hex digest of the hash
+         """
+    sha1 = hashlib.sha1()
+    with open(df_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+def cache_paths(df_path):
+    """cache_paths
+
+     This function return the paths of cache files for the .csv file
+
+     Args:
+         df_path (str): string contains path to the .csv file
+
+     Returns:
+         meta_path (str): path to the .json file
+         values_path (str): path to the .npy file
+         """
+    base = os.path.join(cache_dir, os.path.splitext(os.path.basename(df_path))[0])
+    return base + '.json', base + '.npy'
+
+
+def write_atomic(path, write):
+    """write_atomic
+
+     This function write the file under temporary name and then rename it,
+     so other process never read half-written cache
+
+     Args:
+         path (str): path to the file
+         write (function): function writing to the opened binary file
+
+     Returns:
+         None
+         """
+    tmp_path = '%s.%d.tmp' % (path, os.getpid())
+    with open(tmp_path, 'wb') as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def build_cache(df_path, stat):
+    """build_cache
+
+     This function parse the .csv file and save the cache files
+
+     Args:
+         df_path (str): string contains path to the .csv file
+         stat (stat_result): os.stat of the .csv file
+
+     Returns:
+         meta (dict): the content of the .json file
+         """
+    meta_path, values_path = cache_paths(df_path)
+    df = pd.read_csv(df_path, sep=',', skiprows=3)
+    years = [col for col in df.columns if col.isdigit()]
+    values = np.ascontiguousarray(df[years].to_numpy(dtype=np.float64))
+    meta = {'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha1': file_hash(df_path),
+            'years': years,
+            'codes': list(df['Country Code']),
+            'names': list(df['Country Name']),
+            'indicator_code': df['Indicator Code'].iloc[0],
+            'indicator_name': df['Indicator Name'].iloc[0]}
+    os.makedirs(cache_dir, exist_ok=True)
+    write_atomic(values_path, lambda f: np.save(f, values))
+    write_atomic(meta_path, lambda f: f.write(json.dumps(meta).encode()))
+    return meta
+
+
+def load_meta(df_path):
+    """load_meta
+
+     This function read the .json cache file and check if it is still valid:
+     the same size and mtime as the .csv file, or the same hash (then only the
+     new mtime is saved). Otherwise the cache is made again
+
+     Args:
+         df_path (str): string contains path to the .csv file
+
+     Returns:
+         meta (dict): the content of the .json file
+         """
+    meta_path, values_path = cache_paths(df_path)
+    stat = os.stat(df_path)
+    meta = fresh_meta(df_path, stat, meta_path, values_path)
+    if meta is None:
+        return build_cache(df_path, stat)
+    return meta
+
+
+def fresh_meta(df_path, stat, meta_path, values_path):
+    """fresh_meta
+
+     This function read the .json cache file if the cache is still valid for the .csv file
+
+     Args:
+         df_path (str): string contains path to the .csv file
+         stat (stat_result): os.stat of the .csv file
+         meta_path (str): path to the .json file
+         values_path (str): path to the .npy file
+
+     Returns:
+         meta (dict): the content of the .json file, None if the cache must be made again
+         """
+    if not (os.path.exists(meta_path) and os.path.exists(values_path)):
+        return None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if meta['size'] == stat.st_size and meta['mtime_ns'] == stat.st_mtime_ns:
+        return meta
+    if meta['size'] == stat.st_size and meta['sha1'] == file_hash(df_path):
+        meta['mtime_ns'] = stat.st_mtime_ns
+        write_atomic(meta_path, lambda f: f.write(json.dumps(meta).encode()))
+        return meta
+    return None
+
+
+def read_world_bank(df_path):
+    """read_world_bank
+
+     This function read the .csv file from The Word Bank with one indicator
+     using the cache. The empty column and the indicator columns are not included
+
+     Args:
+         df_path (str): string contains path to the .csv dataset
+
+     Returns:
+         df (dataframe): the dataframe with 'Country Name', 'Country Code' and all years
+         """
+    meta = load_meta(df_path)
+    meta_path, values_path = cache_paths(df_path)
+    values = np.load(values_path, mmap_mode='r')
+    df = pd.DataFrame(values, columns=meta['years'])
+    df.insert(0, 'Country Code', meta['codes'])
+    df.insert(0, 'Country Name', meta['names'])
+    return df
+
+
+def read_matrix(df_path, drop_years=('2020',), scale=None, dtype=np.float64, dropna=False, chunk=4096,
+                indicator=None):
+    """read_matrix
+
+     This function read the countries (without aggregates) from the cached matrix straight
+     into one contiguous array: the rows are copied in chunks from the memory mapped
+     matrix, so only one chunk is converted at a time, and the scaling is done in place
+
+     Args:
+         df_path (str): string contains path to the .csv dataset
+         drop_years (list): the years (columns) which are not read
+         scale (float): the values are divided by it (in place), None to keep them
+         dtype (type): np.float64 or np.float32
+         dropna (bool): delete the countries with missing data in any year
+         chunk (int): the number of rows copied at once
+         indicator (str): the indicator code if df_path is the bulk .csv (see read_wdi)
+
+     Returns:
+         codes (ndarray): the country codes of the rows
+         years (list): the years of the columns
+         values (ndarray): matrix (countries x years)
+         """
+    if indicator is None:
+        meta = load_meta(df_path)
+        meta_path, values_path = cache_paths(df_path)
+        matrix = np.load(values_path, mmap_mode='r')
+    else:
+        meta, cube = read_wdi(df_path, [indicator])
+        matrix = cube[meta['indicators'].index(indicator)]
+    cols = [k for k, year in enumerate(meta['years']) if year not in drop_years]
+    years = [meta['years'][k] for k in cols]
+    if cols == list(range(cols[0], cols[-1] + 1)):
+        cols = slice(cols[0], cols[-1] + 1)
+    codes = np.array(meta['codes'])
+    keep = country_mask(codes)
+    if dropna:
+        for start in range(0, len(codes), chunk):
+            keep[start:start + chunk] &= ~np.isnan(matrix[start:start + chunk, cols]).any(axis=1)
+    rows = np.flatnonzero(keep)
+    values = np.empty((len(rows), len(years)), dtype=dtype)
+    for start in range(0, len(rows), chunk):
+        values[start:start + chunk] = matrix[rows[start:start + chunk]][:, cols]
+    if scale is not None:
+        np.divide(values, scale, out=values)
+    return codes[rows], years, values
+
+
+def matrix_frame(codes, years, values, transpose=False):
+    """matrix_frame
+
+     This function wrap the matrix from read_matrix as the dataframe without copying it,
+     the transposed dataframe is a view of the same array
+
+     Args:
+         codes (ndarray): the country codes of the rows
+         years (list): the years of the columns
+         values (ndarray): matrix (countries x years)
+         transpose (bool): years as index and countries as columns
+
+     Returns:
+         df (dataframe): the dataframe with the country codes ('Country Code') and years
+         """
+    codes = pd.Index(codes, name='Country Code')
+    if transpose:
+        return pd.DataFrame(values.T, index=pd.Index(years), columns=codes, copy=False)
+    return pd.DataFrame(values, index=codes, columns=pd.Index(years), copy=False)
+
+
+def wdi_paths(wdi_path):
+    """wdi_paths
+
+     This function return the paths of cache files for the bulk .csv file
+
+     Args:
+         wdi_path (str): string contains path to the bulk .csv file
+
+     Returns:
+         meta_path (str): path to the .json file
+         cube_path (str): path to the .npy file with the cube
+         """
+    base = os.path.join(cache_dir, os.path.splitext(os.path.basename(wdi_path))[0] + '_cube')
+    return base + '.json', base + '.npy'
+
+
+def open_wdi(wdi_path):
+    """open_wdi
+
+     This function open the .csv file and skip the lines before the header
+     (the files of one indicator start with "Data Source" and "Last Updated Date")
+
+     Args:
+         wdi_path (str): string contains path to the .csv file
+
+     Returns:
+         file (file): the opened file at the header line
+         header (list): the names of the columns
+         """
+    file = open(wdi_path, encoding='utf-8-sig', newline='')
+    while True:
+        start = file.tell()
+        line = file.readline()
+        if not line:
+            file.close()
+            raise ValueError('no "Country Name" header in %s' % wdi_path)
+        if line.startswith('"Country Name"') or line.startswith('Country Name'):
+            file.seek(start)
+            return file, next(csv.reader([line]))
+
+
+def build_wdi_cube(wdi_path, stat, indicators=None, chunksize=20000):
+    """build_wdi_cube
+
+     This function stream the bulk .csv file in chunks two times: the first pass read
+     only the codes and names (so the size of the cube is known), the second one parse
+     the years of the rows with the chosen indicators (the other rows are dropped from
+     every chunk) straight into the float32 cube memory mapped on disk.
+     The cube is indicators x countries x years, so one indicator is one contiguous block
+
+     Args:
+         wdi_path (str): string contains path to the bulk .csv file
+         stat (stat_result): os.stat of the .csv file
+         indicators (list): the indicator codes to keep, None for all
+         chunksize (int): the number of rows parsed at once
+
+     Returns:
+         meta (dict): the content of the .json file
+         """
+    meta_path, cube_path = wdi_paths(wdi_path)
+    wanted = None if indicators is None else set(indicators)
+    countries = {}
+    names = {}
+    file, header = open_wdi(wdi_path)
+    years = [col for col in header if col.isdigit()]
+    with file:
+        for chunk in pd.read_csv(file, usecols=['Country Name', 'Country Code', 'Indicator Name', 'Indicator Code'],
+                                 dtype=str, chunksize=chunksize):
+            countries.update(zip(chunk['Country Code'], chunk['Country Name']))
+            if wanted is not None:
+                chunk = chunk[chunk['Indicator Code'].isin(wanted)]
+            names.update(zip(chunk['Indicator Code'], chunk['Indicator Name']))
+    codes = pd.Index(list(countries))
+    codes_indicators = pd.Index(list(names))
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = '%s.%d.tmp.npy' % (cube_path, os.getpid())
+    cube = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32,
+                                     shape=(len(codes_indicators), len(codes), len(years)))
+    cube[:] = np.nan
+    file, header = open_wdi(wdi_path)
+    with file:
+        for chunk in pd.read_csv(file, usecols=['Country Code', 'Indicator Code'] + years,
+                                 dtype=dict({year: np.float32 for year in years},
+                                            **{'Country Code': str, 'Indicator Code': str}),
+                                 chunksize=chunksize):
+            if wanted is not None:
+                chunk = chunk[chunk['Indicator Code'].isin(wanted)]
+            cube[codes_indicators.get_indexer(chunk['Indicator Code']),
+                 codes.get_indexer(chunk['Country Code'])] = chunk[years].to_numpy(dtype=np.float32)
+    cube.flush()
+    del cube
+    os.replace(tmp_path, cube_path)
+    meta = {'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha1': file_hash(wdi_path),
+            'years': years,
+            'codes': list(codes),
+            'names': [countries[code] for code in codes],
+            'indicators': list(codes_indicators),
+            'indicator_names': [names[code] for code in codes_indicators],
+            'selection': None if indicators is None else sorted(wanted)}
+    write_atomic(meta_path, lambda f: f.write(json.dumps(meta).encode()))
+    return meta
+
+
+def read_wdi(wdi_path, indicators=None):
+    """read_wdi
+
+     This function return the cube of the bulk .csv file of World Development Indicators
+     (or any .csv file from The World Bank). The cube is made the first time and when
+     the .csv file changes. The cached cube is used for any indicators it was made with
+     (the cube of all indicators for any of them, the cube of the chosen indicators
+     for some of them), it is made again only if one of the indicators is missing, then with
+     the indicators of both. So the cube may have more indicators than asked for,
+     find them by meta['indicators']
+
+     Args:
+         wdi_path (str): string contains path to the bulk .csv file
+         indicators (list): the indicator codes needed, None for all
+
+     Returns:
+         meta (dict): years, country codes and names, indicator codes and names
+         cube (ndarray): memory mapped float32 matrix (indicators x countries x years),
+                         np.moveaxis(cube, 0, -1) is the countries x years x indicators view
+         """
+    meta_path, cube_path = wdi_paths(wdi_path)
+    stat = os.stat(wdi_path)
+    meta = fresh_meta(wdi_path, stat, meta_path, cube_path)
+    if meta is not None and meta['selection'] is not None:
+        if indicators is None:
+            meta = None
+        elif not set(indicators) <= set(meta['selection']):
+            indicators = set(indicators) | set(meta['selection'])
+            meta = None
+    if meta is None:
+        meta = build_wdi_cube(wdi_path, stat, indicators)
+    return meta, np.load(cube_path, mmap_mode='r')
+
+
+def read_indicator(wdi_path, indicator):
+    """read_indicator
+
+     This function read one indicator from the cube as the dataframe
+     in the same form as read_world_bank
+
+     Args:
+         wdi_path (str): string contains path to the bulk .csv file
+         indicator (str): the indicator code (for example SP.POP.TOTL)
+
+     Returns:
+         df (dataframe): the dataframe with 'Country Name', 'Country Code' and all years
+         """
+    meta, cube = read_wdi(wdi_path, [indicator])
+    df = pd.DataFrame(cube[meta['indicators'].index(indicator)], columns=meta['years'])
+    df.insert(0, 'Country Code', meta['codes'])
+    df.insert(0, 'Country Name', meta['names'])
+    return df
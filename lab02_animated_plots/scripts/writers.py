@@ -0,0 +1,606 @@
+"""
+Data Analysis and Visualization, lab 2
+Patrycja Owczarek
+Helper module for saving the animated plots:
+Write the frames (RGBA arrays) straight to ffmpeg, the mp4 and the gif file
+are encoded at the same time from the same frames, the static part of the plot
+can be rasterized only once. The gif uses one palette for all frames, only the changed
+rectangle of every frame is dithered again, repeated frames can be merged into one longer
+frame and the file can be made smaller with lossy LZW (gifsicle). The frames can be
+written to ffmpeg by a background thread while the next frames are drawn. One stream
+of big frames can give several files at once (smaller mp4 files, the strip of thumbnails
+and the poster of the last frame), so the plot is drawn only once for all sizes.
+The frames can be also encoded by other encoders (see encoders): x264, VP9, AV1, APNG,
+the gif of ffmpeg or the gif of Pillow made in the same process
+"""
+
+import io
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+
+import matplotlib
+from matplotlib.animation import AbstractMovieWriter, FFMpegWriter
+import numpy as np
+from PIL import Image
+
+from renderer import StaticLayer
+
+
+def gif_filter(colors=256, dither='none', dedup=False, rectangle=True):
+    """gif_filter
+
+     This function create the part of the ffmpeg filter graph which make the gif
+     from the frames [g]: the palette is made once from all frames (palettegen) and used
+     for every frame (paletteuse). The plots have flat colors, so the dithering only adds
+     noise which LZW cannot compress. With rectangle only the part of the frame which
+     changed is mapped to the palette again, the rest stays the same as in the previous
+     frame and the gif encoder writes only this rectangle. With dedup the frames which
+     are exactly the same as the previous one are dropped (mpdecimate, in planar
+     RGB so the colors are not changed) and the previous frame is shown longer (the repeated
+     frames at the very end are shown as one frame).
+
+     Args:
+         colors (int): the number of colors of the palette (at most 256)
+         dither (str): the dithering of paletteuse (none, bayer, sierra2_4a, ...)
+         dedup (bool): merge the repeated frames into one longer frame
+         rectangle (bool): map to the palette only the changed rectangle of the frame
+
+     Returns:
+         (str): the filter graph from [g] to [gif]
+         """
+    graph = '[g]%ssplit[a][b];' % ('format=gbrp,mpdecimate=hi=0:lo=0:frac=0,' if dedup else '')
+    graph += '[a]palettegen=max_colors=%d[p];' % colors
+    graph += '[b][p]paletteuse=dither=%s%s[gif]' % (dither, ':diff_mode=rectangle' if rectangle else '')
+    return graph
+
+
+def lossy_gif(path, lossy=80):
+    """lossy_gif
+
+     This function make the gif file smaller with gifsicle: the LZW compression may
+     change the pixels a little (--lossy) and the frames are optimized again (-O3).
+     gifsicle is not needed for anything else, so it is optional
+
+     Args:
+         path (str): path to the gif file (changed in place)
+         lossy (int): how much the pixels may change, 20 is hardly visible, 200 is a lot
+
+     Returns:
+         None
+         """
+    gifsicle = shutil.which('gifsicle')
+    if gifsicle is None:
+        raise RuntimeError('lossy gif needs gifsicle (https://www.lcdf.org/gifsicle/)')
+    subprocess.run([gifsicle, '-O3', '--lossy=%d' % lossy, '-b', path], check=True)
+
+
+def pipe_args(frame_size, fps=5, source='pipe:'):
+    """pipe_args
+
+     This function create the beginning of the ffmpeg command which read the RGBA frames
+
+     Args:
+         frame_size (tuple): width and height of the frame in pixels
+         fps (int): frames per second
+         source (str): pipe: for stdin or path to the raw file
+
+     Returns:
+         args (list): the command until the input
+         """
+    return [matplotlib.rcParams['animation.ffmpeg_path'],
+            '-f', 'rawvideo', '-vcodec', 'rawvideo',
+            '-s', '%dx%d' % frame_size, '-pix_fmt', 'rgba',
+            '-framerate', str(fps), '-loglevel', 'error',
+            '-i', source]
+
+
+def ffmpeg_args(output, frame_size, fps=5, gif=None, preset=None, graph=None, gif_step=1):
+    """ffmpeg_args
+
+     This function create the ffmpeg command for encoding RGBA frames read from stdin.
+     The arguments are the same as matplotlib uses in ani.save, so the mp4 file
+     is the same as the one saved by matplotlib. If the gif file is given, the frames
+     are split in the filter graph: one copy is encoded to mp4, the other one to the gif
+     (see gif_filter, the repeated frames are merged into one longer frame). With gif_step
+     the gif gets only every gif_step-th frame, each shown gif_step times longer
+     (the tweened bar races keep one frame per year in the gif)
+
+     Args:
+         output (str): path to the output mp4 file
+         frame_size (tuple): width and height of the frame in pixels
+         fps (int): frames per second
+         gif (str): path to the output gif file or None
+         preset (str): the x264 preset of the mp4 file (for example ultrafast) or None
+         graph (str): the filter graph of the gif from gif_filter, None for the default one
+         gif_step (int): every gif_step-th frame goes to the gif
+
+     Returns:
+         args (list): the command as a list of arguments
+         """
+    args = pipe_args(frame_size, fps)
+    if gif is not None:
+        split = 'split[mp4][g];'
+        if gif_step > 1:
+            split = "split[mp4][all];[all]select='not(mod(n\\,%d))',fps=%d/%d[g];" % (gif_step, fps, gif_step)
+        args += ['-filter_complex', split + (graph or gif_filter(dedup=True)), '-map', '[mp4]']
+    args += mp4_args(preset) + ['-y', output]
+    if gif is not None:
+        args += ['-map', '[gif]', '-y', gif]
+    return args
+
+
+def mp4_args(preset=None):
+    """mp4_args
+
+     This function create the encoder arguments of the mp4 file (the same as matplotlib uses)
+
+     Args:
+         preset (str): the x264 preset of the mp4 file (for example ultrafast) or None
+
+     Returns:
+         args (list): the arguments before the path of the mp4 file
+         """
+    args = ['-vcodec', matplotlib.rcParams['animation.codec'], '-pix_fmt', 'yuv420p']
+    if preset is not None:
+        args += ['-preset', preset]
+    args += matplotlib.rcParams['animation.ffmpeg_args']
+    return args
+
+
+def renditions_args(output, frame_size, fps=5, videos=None, strip=None, poster=None, preset=None):
+    """renditions_args
+
+     This function create the ffmpeg command which make several files from one stream
+     of RGBA frames read from stdin: the frames are split in the filter graph and
+     every copy is scaled (lanczos) and encoded on its own, so the frames are drawn
+     and sent to ffmpeg only once. The output file gets the frames as they are,
+     the videos are scaled to the given height (the width keeps the aspect ratio),
+     the strip is one png with every n-th frame in one row and the poster is one png
+     with the chosen frame (the other frames are dropped in the filter graph, so the png
+     file is written only once)
+
+     Args:
+         output (str): path to the mp4 file with the full size frames
+         frame_size (tuple): width and height of the frame in pixels
+         fps (int): frames per second
+         videos (dict): path to the mp4 file -> its height in pixels
+         strip (tuple): path to the png file, every n-th frame, the number of thumbnails
+                        and the width of one thumbnail, or None
+         poster (tuple): path to the png file and the number of the frame, or None
+         preset (str): the x264 preset of the mp4 files or None
+
+     Returns:
+         args (list): the command as a list of arguments
+         """
+    videos = videos or {}
+    outputs = 1 + len(videos) + (strip is not None) + (poster is not None)
+    graph = ['split=%d%s' % (outputs, ''.join('[o%d]' % k for k in range(outputs)))]
+    maps = [(['-map', '[o0]'] + mp4_args(preset), output)]
+    for k, (path, height) in enumerate(videos.items(), 1):
+        graph.append('[o%d]scale=-2:%d:flags=lanczos[v%d]' % (k, height, k))
+        maps.append((['-map', '[v%d]' % k] + mp4_args(preset), path))
+    k = 1 + len(videos)
+    if strip is not None:
+        path, every, count, width = strip
+        graph.append("[o%d]select='not(mod(n\\,%d))',scale=%d:-2:flags=lanczos,tile=%dx1[strip]"
+                     % (k, every, width, count))
+        maps.append((['-map', '[strip]', '-frames:v', '1'], path))
+        k += 1
+    if poster is not None:
+        path, frame = poster
+        graph.append("[o%d]select='eq(n\\,%d)'[poster]" % (k, frame))
+        maps.append((['-map', '[poster]', '-frames:v', '1'], path))
+    args = pipe_args(frame_size, fps) + ['-filter_complex', ';'.join(graph)]
+    for output_args, path in maps:
+        args += output_args + ['-y', path]
+    return args
+
+
+class Mp4GifWriter(FFMpegWriter):
+    """Mp4GifWriter
+
+     The matplotlib writer for ani.save which save the mp4 and the gif file
+     with one ffmpeg process
+
+     Args:
+         gif (str): path to the output gif file or None (only mp4)
+         fps (int): frames per second
+         preset (str): the x264 preset of the mp4 file or None
+         graph (str): the filter graph of the gif from gif_filter, None for the default one
+         lossy (int): the --lossy of gifsicle run on the saved gif, None to keep the gif as it is
+         gif_step (int): every gif_step-th frame goes to the gif
+     """
+
+    def __init__(self, gif, fps=5, preset=None, graph=None, lossy=None, gif_step=1):
+        super().__init__(fps=fps)
+        self.gif = gif
+        self.preset = preset
+        self.graph = graph
+        self.lossy = lossy
+        self.gif_step = gif_step
+
+    def _args(self):
+        return ffmpeg_args(self.outfile, self.frame_size, self.fps, self.gif, self.preset, self.graph,
+                           self.gif_step)
+
+    def finish(self):
+        super().finish()
+        if self.gif is not None and self.lossy is not None:
+            lossy_gif(self.gif, self.lossy)
+
+
+class LayeredWriter(Mp4GifWriter):
+    """LayeredWriter
+
+     The Mp4GifWriter which rasterize the static part of the plot only once (see StaticLayer)
+     and in every frame draw only the animated artists. If the plot has no animated
+     artists (FuncAnimation without blit), every frame is drawn whole as usual.
+     ani.save still draws the whole figure after every frame (draw_idle), so the frames
+     should be made by Plot.save, then the figure is drawn only once
+
+     Args:
+         gif (str): path to the output gif file or None (only mp4)
+         fps (int): frames per second
+         preset (str): the x264 preset of the mp4 file or None
+         graph (str): the filter graph of the gif from gif_filter, None for the default one
+         lossy (int): the --lossy of gifsicle run on the saved gif, None to keep the gif as it is
+         gif_step (int): every gif_step-th frame goes to the gif
+     """
+
+    def setup(self, fig, outfile, dpi=None):
+        super().setup(fig, outfile, dpi)
+        self.layer = StaticLayer(fig)
+
+    def grab_frame(self, **savefig_kwargs):
+        if self.layer.background is None:
+            self.layer.cache()
+        if not self.layer.artists or self.dpi != self.fig.dpi:
+            super().grab_frame(**savefig_kwargs)
+            return
+        self._proc.stdin.write(self.layer.draw().data)
+
+
+class PipelinedWriter(LayeredWriter):
+    """PipelinedWriter
+
+     The LayeredWriter which does not wait for ffmpeg: the frames are drawn on the main
+     thread into the ring of preallocated RGBA arrays and the background thread writes
+     them to ffmpeg, so the encoding of one frame overlaps the drawing of the next ones.
+     If all arrays are waiting for ffmpeg, grab_frame waits for the oldest one (so at most
+     slots frames are in memory). The error of the background thread is raised in the next
+     grab_frame or in finish, the thread is always stopped in finish (ani.save calls it
+     also after an error)
+
+     Args:
+         gif (str): path to the output gif file or None (only mp4)
+         fps (int): frames per second
+         preset (str): the x264 preset of the mp4 file or None
+         graph (str): the filter graph of the gif from gif_filter, None for the default one
+         lossy (int): the --lossy of gifsicle run on the saved gif, None to keep the gif as it is
+         gif_step (int): every gif_step-th frame goes to the gif
+         slots (int): the number of frames in the ring
+     """
+
+    def __init__(self, gif, fps=5, preset=None, graph=None, lossy=None, gif_step=1, slots=4):
+        super().__init__(gif, fps, preset, graph, lossy, gif_step)
+        self.slots = slots
+
+    def setup(self, fig, outfile, dpi=None):
+        super().setup(fig, outfile, dpi)
+        width, height = self.frame_size
+        self.ring = np.empty((self.slots, height, width, 4), dtype=np.uint8)
+        self.free = queue.Queue()
+        for slot in range(self.slots):
+            self.free.put(slot)
+        self.filled = queue.Queue()
+        self.error = None
+        self.thread = threading.Thread(target=self.feed, args=(self._proc.stdin,), daemon=True)
+        self.thread.start()
+
+    def feed(self, stdin):
+        """feed
+
+         This function run in the background thread: write the filled arrays in order
+         to ffmpeg until None comes. After an error the arrays are only given back,
+         so grab_frame never waits forever
+
+         Args:
+             stdin (file): the stdin of ffmpeg
+
+         Returns:
+             None
+             """
+        while True:
+            slot = self.filled.get()
+            if slot is None:
+                return
+            try:
+                if self.error is None:
+                    stdin.write(self.ring[slot].data)
+            except Exception as error:
+                self.error = error
+            finally:
+                self.free.put(slot)
+
+    def grab_frame(self, **savefig_kwargs):
+        if self.error is not None:
+            raise self.error
+        slot = self.free.get()
+        try:
+            self.draw_frame(self.ring[slot], savefig_kwargs)
+        except BaseException:
+            self.free.put(slot)
+            raise
+        self.filled.put(slot)
+
+    def draw_frame(self, frame, savefig_kwargs):
+        """draw_frame
+
+         This function draw the frame into the array of the ring: only the animated
+         artists on the static layer, or the whole figure like MovieWriter.grab_frame
+         (it is saved to memory instead of stdin of ffmpeg)
+
+         Args:
+             frame (ndarray): the RGBA array (height x width x 4)
+             savefig_kwargs (dict): the arguments of savefig from ani.save
+
+         Returns:
+             None
+             """
+        if self.layer.background is None:
+            self.layer.cache()
+        if self.layer.artists and self.dpi == self.fig.dpi:
+            np.copyto(frame, self.layer.draw())
+            return
+        stdin = self._proc.stdin
+        self._proc.stdin = buffer = io.BytesIO()
+        try:
+            Mp4GifWriter.grab_frame(self, **savefig_kwargs)
+        finally:
+            self._proc.stdin = stdin
+        frame.reshape(-1)[:] = np.frombuffer(buffer.getbuffer(), dtype=np.uint8)
+
+    def finish(self):
+        self.filled.put(None)
+        self.thread.join()
+        super().finish()
+        if self.error is not None:
+            raise self.error
+
+
+class RenditionWriter(PipelinedWriter):
+    """RenditionWriter
+
+     The PipelinedWriter for ani.save which save the mp4 file with the drawn frames
+     and the other sizes at once with one ffmpeg process (see renditions_args)
+
+     Args:
+         videos (dict): path to the mp4 file -> its height in pixels
+         strip (tuple): path to the png file, every n-th frame, the number of thumbnails
+                        and the width of one thumbnail, or None
+         poster (tuple): path to the png file and the number of the frame, or None
+         fps (int): frames per second
+         preset (str): the x264 preset of the mp4 files or None
+         slots (int): the number of frames in the ring
+     """
+
+    def __init__(self, videos=None, strip=None, poster=None, fps=5, preset=None, slots=4):
+        super().__init__(None, fps, preset, slots=slots)
+        self.videos = videos
+        self.strip = strip
+        self.poster = poster
+
+    def _args(self):
+        return renditions_args(self.outfile, self.frame_size, self.fps, self.videos, self.strip,
+                               self.poster, self.preset)
+
+
+encoders = {
+    'x264': {'ext': 'mp4', 'codec': 'libx264', 'preset': '-preset',
+             'args': ['-pix_fmt', 'yuv420p', '-movflags', '+faststart']},
+    'vp9': {'ext': 'webm', 'codec': 'libvpx-vp9', 'preset': '-cpu-used',
+            'args': ['-pix_fmt', 'yuv420p', '-b:v', '0', '-crf', '35', '-row-mt', '1', '-deadline', 'good']},
+    'av1-aom': {'ext': 'webm', 'codec': 'libaom-av1', 'preset': '-cpu-used',
+                'args': ['-pix_fmt', 'yuv420p', '-b:v', '0', '-crf', '35', '-row-mt', '1', '-usage', 'good']},
+    'av1-svt': {'ext': 'webm', 'codec': 'libsvtav1', 'preset': '-preset',
+                'args': ['-pix_fmt', 'yuv420p', '-crf', '35']},
+    'apng': {'ext': 'png', 'codec': 'apng', 'preset': None,
+             'args': ['-pix_fmt', 'rgb24', '-plays', '0', '-f', 'apng']},
+    'gif': {'ext': 'gif', 'codec': 'gif', 'preset': None,
+            'args': ['-filter_complex', '[0:v]null[g];' + gif_filter(dedup=True), '-map', '[gif]']},
+    'pillow-gif': {'ext': 'gif', 'codec': None, 'preset': None, 'args': []},
+}
+default_presets = {'x264': 'medium', 'vp9': '4', 'av1-aom': '8', 'av1-svt': '10'}
+
+
+def available_encoders():
+    """available_encoders
+
+     This function check which encoders the installed ffmpeg has (the AV1 encoders
+     are often missing), the gif of Pillow needs no ffmpeg
+
+     Args:
+         None
+
+     Returns:
+         (list): the names of the encoders from encoders
+         """
+    result = subprocess.run([matplotlib.rcParams['animation.ffmpeg_path'], '-hide_banner', '-encoders'],
+                            capture_output=True, text=True)
+    codecs = {line.split()[1] for line in result.stdout.splitlines() if len(line.split()) > 1}
+    return [name for name, encoder in encoders.items() if encoder['codec'] is None or encoder['codec'] in codecs]
+
+
+def encoder_args(name, preset=None):
+    """encoder_args
+
+     This function create the output arguments of the encoder (before the path of the file)
+
+     Args:
+         name (str): the name of the encoder from encoders (not pillow-gif)
+         preset (str): the preset of x264 or SVT-AV1, the -cpu-used of VP9 or libaom,
+                       None for default_presets
+
+     Returns:
+         args (list): the arguments of the encoder
+         """
+    encoder = encoders[name]
+    args = encoder['args'] + ['-vcodec', encoder['codec']]
+    preset = preset or default_presets.get(name)
+    if preset is not None:
+        args += [encoder['preset'], str(preset)]
+    return args
+
+
+class EncoderWriter(PipelinedWriter):
+    """EncoderWriter
+
+     The PipelinedWriter for ani.save which encode the frames with one of the encoders
+     (the extension of the file should be encoders[name]['ext'])
+
+     Args:
+         encoder (str): the name of the encoder from encoders (not pillow-gif)
+         fps (int): frames per second
+         preset (str): the preset of the encoder, None for default_presets
+         slots (int): the number of frames in the ring
+     """
+
+    def __init__(self, encoder='x264', fps=5, preset=None, slots=4):
+        super().__init__(None, fps, preset, slots=slots)
+        self.encoder = encoder
+
+    def _args(self):
+        return pipe_args(self.frame_size, self.fps) + encoder_args(self.encoder, self.preset) + ['-y', self.outfile]
+
+
+def global_palette(frames, colors=256, samples=16):
+    """global_palette
+
+     This function make one palette for all frames (like palettegen of ffmpeg), so the same
+     color has the same index in every frame and does not flicker: the palette is made
+     from samples frames spread evenly over the animation (no dithering, the plots have flat colors)
+
+     Args:
+         frames (ndarray): the RGBA or RGB frames (frames x height x width x channels)
+         colors (int): the number of colors of the palette
+         samples (int): the number of frames the palette is made from
+
+     Returns:
+         (Image): the image in P mode with the palette
+         """
+    picks = np.unique(np.linspace(0, len(frames) - 1, min(samples, len(frames))).round().astype(int))
+    sample = np.concatenate([frames[k][:, :, :3] for k in picks])
+    return Image.fromarray(sample).quantize(colors, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+
+
+def quantize_frame(frame, palette):
+    """quantize_frame
+
+     This function map the frame to the palette from global_palette (no dithering),
+     so one pixel takes one byte
+
+     Args:
+         frame (ndarray): the RGBA or RGB array (height x width x channels)
+         palette (Image): the image with the palette from global_palette
+
+     Returns:
+         (Image): the image in P mode
+         """
+    image = Image.fromarray(np.ascontiguousarray(frame[:, :, :3]))
+    return image.quantize(palette=palette, dither=Image.Dither.NONE)
+
+
+def save_gif(images, path, fps=5):
+    """save_gif
+
+     This function save the quantized frames as the gif with Pillow (the frames
+     which are the same as the previous one are merged, only the changed rectangle is written)
+
+     Args:
+         images (list): the images from quantize_frame
+         path (str): path to the gif file
+         fps (int): frames per second
+
+     Returns:
+         None
+         """
+    images[0].save(path, save_all=True, append_images=images[1:], duration=1000 / fps, loop=0)
+
+
+class PillowGifWriter(AbstractMovieWriter):
+    """PillowGifWriter
+
+     The writer for ani.save or Plot.save which make the gif with Pillow in the same process
+     (no ffmpeg): the static part is rasterized once (see StaticLayer), the RGB frames wait
+     in a temporary file and in finish they are mapped to one palette (see global_palette)
+
+     Args:
+         fps (int): frames per second
+         colors (int): the number of colors of the palette
+     """
+
+    def __init__(self, fps=5, colors=256):
+        super().__init__(fps=fps)
+        self.colors = colors
+
+    def setup(self, fig, outfile, dpi=None):
+        super().setup(fig, outfile, dpi)
+        self.layer = StaticLayer(fig)
+        self.file = tempfile.TemporaryFile()
+
+    def grab_frame(self, **savefig_kwargs):
+        if self.layer.background is None:
+            self.layer.cache()
+        if self.layer.artists and self.dpi == self.fig.dpi:
+            frame = self.layer.draw()
+        else:
+            buffer = io.BytesIO()
+            self.fig.savefig(buffer, format='rgba', dpi=self.dpi, **savefig_kwargs)
+            width, height = self.frame_size
+            frame = np.frombuffer(buffer.getbuffer(), dtype=np.uint8).reshape(height, width, 4)
+        self.file.write(np.ascontiguousarray(frame[:, :, :3]).data)
+
+    def finish(self):
+        try:
+            self.file.flush()
+            width, height = self.frame_size
+            frames = np.memmap(self.file, dtype=np.uint8, mode='r').reshape(-1, height, width, 3)
+            palette = global_palette(frames, self.colors)
+            save_gif([quantize_frame(frame, palette) for frame in frames], self.outfile, self.fps)
+            del frames
+        finally:
+            self.file.close()
+
+
+def open_ffmpeg(args):
+    """open_ffmpeg
+
+     This function start ffmpeg, the frames are written to its stdin
+
+     Args:
+         args (list): the command from ffmpeg_args
+
+     Returns:
+         proc (Popen): the ffmpeg process
+         """
+    proc = subprocess.Popen(args, stdin=subprocess.PIPE)
+    return proc
+
+
+def close_ffmpeg(proc):
+    """close_ffmpeg
+
+     This function close stdin of ffmpeg and wait until the file is written
+
+     Args:
+         proc (Popen): the ffmpeg process from open_ffmpeg
+
+     Returns:
+         None
+         """
+    proc.stdin.close()
+    if proc.wait() != 0:
+        raise subprocess.CalledProcessError(proc.returncode, proc.args)